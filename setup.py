@@ -7,4 +7,6 @@ setup(
     description='A short description of the project.',
     author='kabix09',
     license='MIT',
+    # Optional JIT compilation of the sampling loop: pip install -e ".[jit]"
+    extras_require={'jit': ['numba']},
 )
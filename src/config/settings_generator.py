@@ -10,7 +10,7 @@ Output:
     - data/external/settings.pkl
 """
 
-import itertools
+import functools
 import pickle
 import os
 import logging
@@ -29,6 +29,38 @@ logger = logging.getLogger(__name__)
 # -------------------------------------------------------------------
 # Settings generation
 # -------------------------------------------------------------------
+@functools.lru_cache(maxsize=None)
+def _valid_weight_vectors():
+    """
+    Enumerate weight vectors whose components sum to 0.99 or 1.0.
+
+    Weights are handled as integer percentages, so the sum check is exact
+    and the last component is solved for instead of enumerated.
+
+    Returns:
+        tuple[tuple[float, ...], ...]: Valid weight vectors in
+        lexicographic order.
+    """
+    weights = [0, 10, 25, 33, 50, 75, 90, 100]
+    weight_set = set(weights)
+
+    vectors = []
+    for a in weights:
+        for b in weights:
+            if a + b > 100:
+                break
+            for c in weights:
+                if a + b + c > 100:
+                    break
+                # 3 x 0.33 sums to 0.99, which counts as a full vector
+                for total in (99, 100):
+                    d = total - (a + b + c)
+                    if d in weight_set:
+                        vectors.append((a / 100, b / 100, c / 100, d / 100))
+
+    return tuple(vectors)
+
+
 def generate_all_settings():
     """
     Generate all valid combinations of experiment parameters.
@@ -44,15 +76,7 @@ def generate_all_settings():
     page_sizes = [10, 100]
     citation_numbers = [10, 25, 50]
 
-    weights = [0.0, 0.1, 0.25, 0.33, 0.5, 0.75, 0.9, 1.0]
-
-    all_combinations = itertools.product(weights, repeat=4)
-
-    valid_weight_vectors = [
-        list(c)
-        for c in all_combinations
-        if 0.99 <= sum(c) <= 1.0
-    ]
+    valid_weight_vectors = _valid_weight_vectors()
 
     settings = []
     for page_size in page_sizes:
@@ -61,7 +85,7 @@ def generate_all_settings():
                 settings.append({
                     "N": page_size,
                     "k": citation_number,
-                    "pn": weight_vector
+                    "pn": list(weight_vector)
                 })
 
     return settings
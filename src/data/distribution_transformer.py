@@ -1,85 +1,186 @@
-# -*- coding: utf-8 -*-
-
-import pandas as pd
-import json
-import os
-from collections import Counter
-from tqdm import tqdm
-
-
-class DistributionTransformer:
-    def __init__(self, metadata_path="data/interim/articles_with_score_df.csv"):
-        """
-        Initialize the transformer and load article metadata.
-
-        Builds a fast lookup dictionary mapping:
-        article_id (str) -> citation count (int)
-        """
-        print("Loading metadata for distribution transformation...")
-        df_meta = pd.read_csv(metadata_path)
-
-        # Fast lookup dictionary: article_id -> number of citations
-        # self.id_to_citation = pd.Series(
-        #     df_meta.n_citation.values,
-        #     index=df_meta.id.astype(str)
-        # ).to_dict()
-
-        self.id_to_citation = {
-            str(idx + 1): row["n_citation"] 
-            for idx, row in df_meta.iterrows()
-        }
-
-    def transform_to_citations(
-        self,
-        input_path="data/processed/global_distributions.csv",
-        output_path="data/processed/final_citation_distributions.csv"
-    ):
-        """
-        Transform article-level selection distributions into citation-level distributions.
-
-        Each article ID in the global distribution is replaced by its citation count.
-        The output represents a density distribution over citation values
-        for each experimental configuration.
-        """
-        if not os.path.exists(input_path):
-            raise FileNotFoundError(f"Input file not found: {input_path}")
-
-        print(f"Starting transformation of results from {input_path}...")
-        df_results = pd.read_csv(input_path)
-
-        final_rows = []
-
-        for _, row in tqdm(
-            df_results.iterrows(),
-            total=len(df_results),
-            desc="Transforming distributions"
-        ):
-            # 1. Load distribution dictionary (robust JSON parsing)
-            try:
-                # Normalize quotes to ensure valid JSON format
-                dist_dict = json.loads(row["distribution"].replace("'", '"'))
-            except Exception:
-                # Fallback for Python literal dictionaries
-                import ast
-                dist_dict = ast.literal_eval(row["distribution"])
-
-            # 2. Aggregate selections by citation count
-            # Result: Counter({citation_count: total_selections})
-            citation_counter = Counter()
-            for paper_id, selection_count in dist_dict.items():
-                n_cit = self.id_to_citation.get(str(paper_id))
-                if n_cit is not None:
-                    citation_counter[n_cit] += selection_count
-
-            # 3. Store transformed result
-            final_rows.append({
-                "settings": row["settings"],
-                "citation_distribution": dict(citation_counter)
-            })
-
-        # Persist transformed distributions
-        df_final = pd.DataFrame(final_rows)
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        df_final.to_csv(output_path, index=False)
-
-        print(f"Transformation completed successfully. Output saved to: {output_path}")
+# -*- coding: utf-8 -*-
+
+import ast
+import itertools
+import os
+import numpy as np
+import orjson
+import pandas as pd
+from tqdm import tqdm
+
+
+class DistributionTransformer:
+    def __init__(self, metadata_path="data/interim/articles_with_score_df.parquet"):
+        """
+        Initialize the transformer and load article metadata.
+
+        Builds a dense lookup array indexed by integer article id:
+        citations[article_id] -> citation count (-1 when unknown)
+
+        Article ids are positional (row number + 1), matching the ids
+        used when the articles were loaded into ChromaDB.
+
+        Metadata is read from Parquet; a .csv path is read as CSV.
+        """
+        print("Loading metadata for distribution transformation...")
+        if metadata_path.endswith(".csv"):
+            df_meta = pd.read_csv(metadata_path, usecols=["n_citation"])
+        else:
+            df_meta = pd.read_parquet(metadata_path, columns=["n_citation"])
+
+        # Slot 0 is unused, so an id indexes the array directly
+        n_citation = df_meta["n_citation"]
+        known = n_citation.notna().to_numpy()
+
+        self.citations = np.full(len(df_meta) + 1, -1, dtype=np.int64)
+        self.citations[1:][known] = n_citation[known].to_numpy(dtype=np.int64)
+
+    def transform_to_citations(
+        self,
+        input_path="data/processed/global_distributions.parquet",
+        output_path="data/processed/final_citation_distributions.csv"
+    ):
+        """
+        Transform article-level selection distributions into citation-level distributions.
+
+        Each article ID in the global distribution is replaced by its citation count.
+        The output represents a density distribution over citation values
+        for each experimental configuration.
+
+        Distributions are read from Parquet list columns (paper_ids, counts);
+        a .csv path is read in the legacy serialized-dict format.
+        """
+        if not os.path.exists(input_path):
+            raise FileNotFoundError(f"Input file not found: {input_path}")
+
+        print(f"Starting transformation of results from {input_path}...")
+
+        # 1. Load all distributions as a single long table:
+        #    (row_idx, paper_id, selection_count)
+        if input_path.endswith(".csv"):
+            settings, long_df = self._load_serialized_distributions(input_path)
+        else:
+            settings, long_df = self._load_list_distributions(input_path)
+
+        # 2. Remap paper_id -> citation count with an array gather
+        #    and aggregate selections by citation count per configuration
+        paper_ids = (
+            pd.to_numeric(long_df["paper_id"], errors="coerce")
+            .fillna(0)
+            .to_numpy(dtype=np.int64)
+        )
+        in_range = (paper_ids > 0) & (paper_ids < len(self.citations))
+        n_cit = self.citations[np.where(in_range, paper_ids, 0)]
+
+        long_df["n_cit"] = n_cit
+        long_df = long_df[in_range & (n_cit >= 0)]
+
+        grouped = long_df.groupby(["row_idx", "n_cit"], sort=False)["count"].sum()
+
+        # Result per row: {citation_count: total_selections}
+        # Groups are reordered by row (stable, so first-seen citation order
+        # is kept) and split into per-row slices; no per-entry Python loop.
+        row_idx = grouped.index.get_level_values("row_idx").to_numpy()
+        order = np.argsort(row_idx, kind="stable")
+        n_cit = grouped.index.get_level_values("n_cit").to_numpy()[order]
+        totals = grouped.to_numpy()[order]
+        bounds = np.searchsorted(row_idx[order], np.arange(len(settings) + 1))
+
+        citation_dists = [
+            dict(zip(n_cit[start:stop].tolist(), totals[start:stop].tolist()))
+            for start, stop in zip(bounds[:-1], bounds[1:])
+        ]
+
+        # 3. Store transformed result
+        #    (canonical JSON; integer citation keys are written as strings)
+        final_rows = [
+            {
+                "settings": settings_key,
+                "citation_distribution": orjson.dumps(
+                    citation_dist, option=orjson.OPT_NON_STR_KEYS
+                ).decode()
+            }
+            for settings_key, citation_dist in zip(settings, citation_dists)
+        ]
+
+        # Persist transformed distributions
+        df_final = pd.DataFrame(final_rows)
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        df_final.to_csv(output_path, index=False)
+
+        print(f"Transformation completed successfully. Output saved to: {output_path}")
+
+    @staticmethod
+    def _load_list_distributions(input_path):
+        """
+        Load distributions stored as aligned Parquet list columns.
+
+        The list columns are exploded directly into a long table
+        (row_idx, paper_id, count) without any parsing step.
+        """
+        df_results = pd.read_parquet(input_path)
+
+        long_df = (
+            df_results[["paper_ids", "counts"]]
+            .rename_axis("row_idx")
+            .reset_index()
+            .explode(["paper_ids", "counts"], ignore_index=True)
+            .rename(columns={"paper_ids": "paper_id", "counts": "count"})
+            .dropna(subset=["paper_id"])
+        )
+        long_df["count"] = long_df["count"].astype(np.int64)
+
+        return df_results["settings"].tolist(), long_df
+
+    def _load_serialized_distributions(self, input_path):
+        """
+        Load distributions stored as serialized dicts in a CSV column.
+
+        Returns:
+            tuple: (settings list, long table of (row_idx, paper_id, count))
+        """
+        df_results = pd.read_csv(input_path)
+
+        # Load distribution dictionaries (robust JSON parsing)
+        distributions = [
+            self._parse_distribution(cell)
+            for cell in tqdm(
+                df_results["distribution"],
+                total=len(df_results),
+                desc="Parsing distributions"
+            )
+        ]
+
+        # Explode all distributions into a single long table
+        lengths = [len(dist_dict) for dist_dict in distributions]
+        long_df = pd.DataFrame({
+            "row_idx": np.repeat(np.arange(len(distributions)), lengths),
+            "paper_id": [
+                str(paper_id)
+                for dist_dict in distributions
+                for paper_id in dist_dict
+            ],
+            "count": np.fromiter(
+                itertools.chain.from_iterable(
+                    dist_dict.values() for dist_dict in distributions
+                ),
+                dtype=np.int64,
+                count=sum(lengths)
+            ),
+        })
+
+        return df_results["settings"].tolist(), long_df
+
+    @staticmethod
+    def _parse_distribution(data_str):
+        """
+        Parse a serialized distribution dictionary {paper_id: selection_count}.
+
+        Canonical JSON is parsed with orjson; files written by older
+        producers (Python dict literals) fall back to ast.literal_eval.
+        """
+        try:
+            return orjson.loads(data_str)
+        except orjson.JSONDecodeError:
+            # Fallback for Python literal dictionaries
+            return ast.literal_eval(data_str)
@@ -10,12 +10,14 @@ This script:
 4. Produces a cleaned dataset enriched with government scores.
 
 Output:
-    data/interim/articles_with_score_df.csv
+    data/interim/articles_with_score_df.parquet
+    (a .csv output path writes a plain-text export instead)
 """
 
 import os
-import json
 import logging
+from concurrent.futures import ProcessPoolExecutor
+import orjson
 import pandas as pd
 import numpy as np
 from tqdm import tqdm
@@ -30,6 +32,15 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Columns of the enriched dataset (order preserved in the output file)
+OUTPUT_COLUMNS = [
+    "id", "title", "year", "references", "authors",
+    "n_citation", "venue", "gov_score"
+]
+
+# Venue lookup shared with worker processes (set once per worker)
+_worker_venue_scores = None
+
 
 # -------------------------------------------------------------------
 # Government (ministerial) data loading
@@ -48,14 +59,21 @@ def load_gov_data(excel_path):
     """
     logger.info("Loading ministerial journal and conference lists...")
 
+    # Open the workbook once; both sheets are parsed from the same handle
+    with pd.ExcelFile(excel_path) as workbook:
+        gov_articles_data = workbook.parse(sheet_name=0, header=None)
+        gov_conferences_data = workbook.parse(sheet_name=1)
+
     # ---- Journals (sheet 0) ----
-    gov_articles_data = pd.read_excel(excel_path, sheet_name=0, header=None)
 
-    # Merge header rows into a single header
+    # Merge header rows into a single header (plain numpy, no pandas alignment)
+    header_top = gov_articles_data.iloc[0].to_numpy(dtype=object)
+    header_sub = gov_articles_data.iloc[1].to_numpy(dtype=object)
+
     gov_articles_data.columns = np.where(
-        gov_articles_data.iloc[0].notna(),
-        gov_articles_data.iloc[0].astype(str) + ' - ' + gov_articles_data.iloc[1].astype(str),
-        gov_articles_data.iloc[1]
+        pd.notna(header_top),
+        np.char.add(np.char.add(header_top.astype(str), ' - '), header_sub.astype(str)),
+        header_sub
     )
 
     gov_articles_data = gov_articles_data[2:].reset_index(drop=True)
@@ -63,19 +81,20 @@ def load_gov_data(excel_path):
     journals_list = gov_articles_data[['Tytuł 2', 'Punkty']]
     journals_list = journals_list.drop_duplicates(subset=['Tytuł 2']).dropna()
 
-    journal_lookup = journals_list.set_index('Tytuł 2').to_dict(orient='index')
+    journal_lookup = dict(zip(journals_list['Tytuł 2'], journals_list['Punkty']))
 
     # ---- Conferences (sheet 1) ----
-    gov_conferences_data = pd.read_excel(excel_path, sheet_name=1)
     gov_conferences_data['Przypisane dyscypliny naukowe'] = (
         gov_conferences_data['Przypisane dyscypliny naukowe']
-        .replace('\n', ' ', regex=True)
+        .str.replace('\n', ' ', regex=False)
     )
 
     conferences_list = gov_conferences_data[['Nazwa konferencji', 'Liczba punktów']]
     conferences_list = conferences_list.drop_duplicates(subset=['Nazwa konferencji']).dropna()
 
-    conference_lookup = conferences_list.set_index('Nazwa konferencji').to_dict(orient='index')
+    conference_lookup = dict(zip(
+        conferences_list['Nazwa konferencji'], conferences_list['Liczba punktów']
+    ))
 
     return journal_lookup, conference_lookup
 
@@ -83,6 +102,38 @@ def load_gov_data(excel_path):
 # -------------------------------------------------------------------
 # DBLP raw data loading
 # -------------------------------------------------------------------
+def list_dblp_files(directory_path):
+    """
+    List DBLP JSON Lines files (shards) in a directory.
+    """
+    return [
+        os.path.join(directory_path, f)
+        for f in os.listdir(directory_path) if f.endswith('.json')
+    ]
+
+
+def iter_dblp_publications(directory_path):
+    """
+    Stream raw DBLP publications from JSON files.
+
+    Each file is expected to be in JSON Lines format. Lines are read as
+    raw bytes and parsed with orjson, so no text decoding pass is needed.
+
+    Args:
+        directory_path (str): Directory containing DBLP JSON files.
+
+    Yields:
+        dict: Single publication dictionary.
+    """
+    for file_path in list_dblp_files(directory_path):
+        file_name = os.path.basename(file_path)
+        logger.info(f"Processing file: {file_name}")
+
+        with open(file_path, 'rb') as f:
+            for line in tqdm(f, desc=f"Loading {file_name}"):
+                yield orjson.loads(line)
+
+
 def load_dblp_raw_data(directory_path):
     """
     Load raw DBLP publications from JSON files.
@@ -99,77 +150,196 @@ def load_dblp_raw_data(directory_path):
     publications = []
 
     try:
-        file_names = [f for f in os.listdir(directory_path) if f.endswith('.json')]
+        for pub in iter_dblp_publications(directory_path):
+            # Ensure required keys exist
+            pub.setdefault('references', [])
+            pub.setdefault('authors', [])
+            pub.setdefault('venue', '')
+
+            publications.append(pub)
+
+        return publications
+
+    except Exception as e:
+        logger.error(f"Error while loading DBLP data: {e}")
+        return []
 
-        for file_name in file_names:
-            logger.info(f"Processing file: {file_name}")
 
-            with open(os.path.join(directory_path, file_name), 'r', encoding='utf-8') as f:
-                for line in tqdm(f, desc=f"Loading {file_name}"):
-                    pub = json.loads(line)
+def merge_venue_scores(journal_lookup, conference_lookup):
+    """
+    Merge journal and conference lookups into a single venue → score dict.
 
-                    # Ensure required keys exist
-                    pub.setdefault('references', [])
-                    pub.setdefault('authors', [])
-                    pub.setdefault('venue', '')
+    Conference scores take precedence over journal scores.
+    """
+    return {**journal_lookup, **conference_lookup}
 
-                    publications.append(pub)
 
-        return publications
+def score_publication(pub, venue_scores):
+    """
+    Match a publication with its ministerial venue score.
+
+    Args:
+        pub (dict): Raw DBLP publication.
+        venue_scores (dict): Venue → score (see merge_venue_scores()).
+
+    Returns:
+        tuple or None: Record with fields ordered as in OUTPUT_COLUMNS,
+        or None when the venue is not on the ministerial lists.
+    """
+    venue = pub.get('venue', '')
+    score = venue_scores.get(venue)
+
+    if score is None:
+        return None
+
+    return (
+        pub.get("id"),
+        pub.get("title"),
+        pub.get("year"),
+        pub.get("references", []),
+        pub.get("authors", []),
+        pub.get("n_citation"),
+        venue,
+        score
+    )
+
+
+def iter_scored_pubs(directory_path, venue_scores):
+    """
+    Stream DBLP publications matched with ministerial venue scores.
+
+    Publications are filtered at parse time, so unmatched records are
+    never accumulated in memory.
+
+    Args:
+        directory_path (str): Directory containing DBLP JSON files.
+        venue_scores (dict): Venue → score
+
+    Yields:
+        tuple: Record with fields ordered as in OUTPUT_COLUMNS.
+    """
+    logger.info(f"Streaming DBLP publications from: {directory_path}")
+
+    try:
+        for pub in iter_dblp_publications(directory_path):
+            record = score_publication(pub, venue_scores)
+            if record is not None:
+                yield record
 
     except Exception as e:
+        # Row ids are positional, so a truncated dataset must not be saved
         logger.error(f"Error while loading DBLP data: {e}")
-        return []
+        raise
+
+
+# -------------------------------------------------------------------
+# Parallel DBLP parsing (one task per JSON file)
+# -------------------------------------------------------------------
+def _init_worker(venue_scores):
+    """
+    Receive the venue lookup once per worker process instead of once per task.
+    """
+    global _worker_venue_scores
+    _worker_venue_scores = venue_scores
+
+
+def _parse_scored_file(file_path):
+    """
+    Parse a single DBLP file and keep only scored publications.
+
+    The venue join stays a per-record dict probe at parse time: only a
+    small fraction of DBLP venues is on the ministerial lists, so building
+    a frame of every publication for a vectorized Series.map() costs more
+    than the join saves.
+
+    Returns:
+        list[tuple]: Records with fields ordered as in OUTPUT_COLUMNS.
+    """
+    venue_scores = _worker_venue_scores
+
+    with open(file_path, 'rb') as f:
+        scored = (
+            score_publication(pub, venue_scores)
+            for pub in map(orjson.loads, f)
+        )
+        return [record for record in scored if record is not None]
+
+
+def iter_scored_pubs_parallel(directory_path, venue_scores, max_workers=None):
+    """
+    Parse DBLP files in parallel worker processes.
+
+    Files are independent, so each one is parsed and filtered by a
+    separate process. Results are yielded in file order, which keeps
+    the output identical to the sequential iter_scored_pubs().
+
+    Args:
+        directory_path (str): Directory containing DBLP JSON files.
+        venue_scores (dict): Venue → score
+        max_workers (int, optional): Number of worker processes
+            (defaults to the number of CPUs).
+
+    Yields:
+        tuple: Record with fields ordered as in OUTPUT_COLUMNS.
+    """
+    file_paths = list_dblp_files(directory_path)
+    logger.info(f"Parsing {len(file_paths)} DBLP files from: {directory_path}")
+
+    try:
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=(venue_scores,)
+        ) as executor:
+            for records in tqdm(
+                executor.map(_parse_scored_file, file_paths),
+                total=len(file_paths),
+                desc="Parsing DBLP files"
+            ):
+                yield from records
+
+    except Exception as e:
+        # Row ids are positional, so a truncated dataset must not be saved
+        logger.error(f"Error while loading DBLP data: {e}")
+        raise
 
 
 # -------------------------------------------------------------------
 # Main data transformation pipeline
 # -------------------------------------------------------------------
-def main(input_excel, dblp_dir, output_file):
+def main(input_excel, dblp_dir, output_file, max_workers=None):
     """
     Execute the full data processing pipeline.
 
     Steps:
         1. Load ministerial scoring data.
-        2. Load raw DBLP publications.
-        3. Match venues and assign scores.
-        4. Save enriched dataset to CSV.
+        2. Parse DBLP files in parallel and assign venue scores.
+        3. Save enriched dataset to Parquet (or CSV for a .csv output path).
+
+    Args:
+        output_file (str): Output path; the extension selects the format.
+        max_workers (int, optional): Number of parsing processes
+            (defaults to the number of CPUs; 1 parses sequentially).
     """
     journal_lookup, conference_lookup = load_gov_data(input_excel)
-    publications = load_dblp_raw_data(dblp_dir)
+    venue_scores = merge_venue_scores(journal_lookup, conference_lookup)
 
     logger.info("Merging DBLP data with ministerial scores...")
-    processed_publications = []
-
-    for pub in tqdm(publications, desc="Merging"):
-        venue = pub.get('venue', '')
-        score = None
-
-        if venue in conference_lookup:
-            score = conference_lookup[venue]['Liczba punktów']
-        elif venue in journal_lookup:
-            score = journal_lookup[venue]['Punkty']
-
-        if score is not None:
-            processed_publications.append({
-                "id": pub.get("id"),
-                "title": pub.get("title"),
-                "year": pub.get("year"),
-                "references": pub.get("references"),
-                "authors": pub.get("authors"),
-                "n_citation": pub.get("n_citation"),
-                "venue": venue,
-                "gov_score": score
-            })
-
-    # Free memory
-    del publications
-
-    logger.info(f"Saving {len(processed_publications)} records to {output_file}")
-    df_final = pd.DataFrame(processed_publications)
+    if max_workers == 1:
+        records = iter_scored_pubs(dblp_dir, venue_scores)
+    else:
+        records = iter_scored_pubs_parallel(dblp_dir, venue_scores, max_workers)
+
+    df_final = pd.DataFrame.from_records(records, columns=OUTPUT_COLUMNS)
+
+    logger.info(f"Saving {len(df_final)} records to {output_file}")
 
     os.makedirs(os.path.dirname(output_file), exist_ok=True)
-    df_final.to_csv(output_file, index=False)
+    if output_file.endswith(".csv"):
+        df_final.to_csv(output_file, index=False)
+    else:
+        # Typed, columnar and compressed; list columns are stored losslessly
+        df_final.to_parquet(output_file, index=False, compression="zstd")
 
     logger.info("Dataset construction completed successfully.")
 
@@ -180,6 +350,7 @@ def main(input_excel, dblp_dir, output_file):
 if __name__ == "__main__":
     INPUT_EXCEL = "data/external/Wykaz_dyscyplin_do_czasopism_i_materiałów_konferencyjnych.xlsx"
     DBLP_DIRECTORY = "data/external/dblp-ref-10"
-    OUTPUT_CSV = "data/interim/articles_with_score_df.csv"
+    # Use a .csv path for a plain-text export (interop)
+    OUTPUT_FILE = "data/interim/articles_with_score_df.parquet"
 
-    main(INPUT_EXCEL, DBLP_DIRECTORY, OUTPUT_CSV)
+    main(INPUT_EXCEL, DBLP_DIRECTORY, OUTPUT_FILE)
@@ -5,7 +5,7 @@ Feature construction and vector database preparation script.
 
 This module:
 1. Generates sentence embeddings for article titles.
-2. Stores embeddings in an intermediate pickle file.
+2. Stores embeddings (FP16 .npy matrix) next to Parquet article metadata.
 3. Loads embeddings into a persistent ChromaDB collection.
 4. Generates synthetic search queries and their embeddings.
 
@@ -14,8 +14,10 @@ to avoid repeated embedding computation.
 """
 
 import os
-import random
+import time
+import hashlib
 import logging
+import numpy as np
 import pandas as pd
 import torch
 import chromadb
@@ -54,42 +56,213 @@ class FeatureBuilder:
         Args:
             model_name (str): Name of the pretrained SentenceTransformer model.
         """
+        self.model_name = model_name
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         logger.info(f"Initializing model '{model_name}' on device: {self.device}")
         self.model = SentenceTransformer(model_name, device=self.device)
 
+        # Half precision doubles tensor-core throughput on GPU
+        # (CPU kernels for FP16 are slow, so the CPU path stays in FP32)
+        if self.device == "cuda":
+            self.model.half()
+
+        # Larger batches keep a GPU saturated; on CPU they only add latency
+        self.default_batch_size = 256 if self.device == "cuda" else 128
+
+        # Raw (unnormalized) vectors: the ChromaDB collection uses the
+        # default L2 space and the simulation scores similarity as
+        # 1 - distance, so normalizing would change every ranking. The
+        # flag is also part of the embedding cache key.
+        self.normalize_embeddings = False
+
+    # -------------------------------------------------------------------
+    # Text encoding
+    # -------------------------------------------------------------------
+    def encode_texts(self, texts, batch_size=None):
+        """
+        Encode texts into embeddings.
+
+        SentenceTransformer.encode already orders each call by text length,
+        so every batch is padded only to similar-length inputs.
+
+        Args:
+            texts (list[str]): Texts to encode.
+            batch_size (int, optional): Encoding batch size
+                (defaults to the device-dependent default_batch_size).
+
+        Returns:
+            np.ndarray: 2-D array of embeddings (one row per text).
+        """
+        return self.model.encode(
+            texts,
+            batch_size=batch_size or self.default_batch_size,
+            show_progress_bar=True,
+            convert_to_numpy=True,
+            normalize_embeddings=self.normalize_embeddings
+        )
+
+    def encode_texts_cached(self, texts, cache_dir, batch_size=None):
+        """
+        Encode texts, reusing embeddings cached on disk by a previous run.
+
+        The cache is content-addressed: every text is keyed by its BLAKE2b
+        hash and the cache lives in a subdirectory per model, model precision
+        (FP16 on GPU, FP32 on CPU) and normalization, so only new or changed
+        texts are sent to the model and differently encoded vectors are
+        never mixed. Cached embeddings are read
+        through a memory map and new ones are appended with an atomic
+        rewrite (temporary file + rename).
+
+        Args:
+            texts (list[str]): Texts to encode.
+            cache_dir (str): Root directory of the embedding cache.
+            batch_size (int, optional): Encoding batch size.
+
+        Returns:
+            np.ndarray: 2-D array of embeddings (one row per text).
+        """
+        precision = str(next(self.model.parameters()).dtype).replace("torch.", "")
+        variant = f"{precision}-{'normalized' if self.normalize_embeddings else 'raw'}"
+        model_dir = os.path.join(cache_dir, self.model_name.replace("/", "__"), variant)
+        keys_path = os.path.join(model_dir, "keys.npy")
+        embeddings_path = os.path.join(model_dir, "embeddings.npy")
+
+        keys = np.array([
+            hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+            for text in texts
+        ])
+
+        if os.path.exists(keys_path):
+            cached_keys = np.load(keys_path)
+            cached_embeddings = np.load(embeddings_path, mmap_mode="r")
+        else:
+            cached_keys = np.empty(0, dtype=keys.dtype)
+            cached_embeddings = None
+
+        rows = pd.Index(cached_keys).get_indexer(keys)
+        miss_positions = np.flatnonzero(rows < 0)
+        logger.info(
+            f"Embedding cache: {len(texts) - len(miss_positions)} hits, "
+            f"{len(miss_positions)} misses"
+        )
+
+        if len(miss_positions):
+            miss_keys, first = np.unique(keys[miss_positions], return_index=True)
+            new_embeddings = self.encode_texts(
+                [texts[i] for i in miss_positions[first]], batch_size
+            )
+
+            os.makedirs(model_dir, exist_ok=True)
+            n_cached = len(cached_keys)
+
+            # Embeddings are replaced before keys, so every stored key
+            # always points at an existing row (even after a crash)
+            tmp_path = embeddings_path + ".tmp"
+            merged = np.lib.format.open_memmap(
+                tmp_path,
+                mode="w+",
+                dtype=new_embeddings.dtype,
+                shape=(n_cached + len(miss_keys), new_embeddings.shape[1])
+            )
+            if n_cached:
+                merged[:n_cached] = cached_embeddings[:n_cached]
+            merged[n_cached:] = new_embeddings
+            merged.flush()
+            del merged, cached_embeddings
+            os.replace(tmp_path, embeddings_path)
+
+            cached_keys = np.concatenate([cached_keys, miss_keys])
+            with open(keys_path + ".tmp", "wb") as f:
+                np.save(f, cached_keys)
+            os.replace(keys_path + ".tmp", keys_path)
+
+            rows = pd.Index(cached_keys).get_indexer(keys)
+            cached_embeddings = np.load(embeddings_path, mmap_mode="r")
+
+        return np.asarray(cached_embeddings[rows])
+
     # -------------------------------------------------------------------
     # Article embeddings
     # -------------------------------------------------------------------
-    def create_article_embeddings(self, input_path, output_path, batch_size=128):
+    def create_article_embeddings(self, input_path, output_path, batch_size=None, cache_dir=None):
         """
         Generate embeddings for article titles and persist them to disk.
 
+        Article metadata is written to `output_path` (Parquet) and the
+        embeddings to a companion .npy matrix (see embeddings_path()).
+
         Args:
-            input_path (str): CSV file containing article metadata.
-            output_path (str): Output pickle file path.
-            batch_size (int): Encoding batch size.
+            input_path (str): Parquet (or .csv) file containing article metadata.
+            output_path (str): Output Parquet file path.
+            batch_size (int, optional): Encoding batch size.
+            cache_dir (str, optional): Embedding cache directory; when set,
+                titles already encoded by a previous run are not re-encoded.
 
         Returns:
-            pd.DataFrame: DataFrame with embedded titles.
+            tuple:
+                - pd.DataFrame: Article metadata (row i ↔ embedding row i)
+                - np.ndarray: FP16 embedding matrix
         """
         logger.info(f"Loading articles from {input_path}")
-        df = pd.read_csv(input_path)
+        if input_path.endswith(".csv"):
+            df = pd.read_csv(input_path)
+        else:
+            df = pd.read_parquet(input_path)
 
         titles = df["title"].tolist()
-        logger.info(f"Encoding {len(titles)} article titles (batch_size={batch_size})")
-
-        embeddings = self.model.encode(
-            titles,
-            batch_size=batch_size,
-            show_progress_bar=True
+        logger.info(
+            f"Encoding {len(titles)} article titles "
+            f"(batch_size={batch_size or self.default_batch_size})"
         )
 
-        df["embedding"] = list(embeddings)
-        df.to_pickle(output_path)
+        if cache_dir:
+            embeddings = self.encode_texts_cached(titles, cache_dir, batch_size)
+        else:
+            embeddings = self.encode_texts(titles, batch_size)
+
+        # FP16 storage halves the file size; ChromaDB upcasts on ingestion.
+        # A contiguous matrix avoids one Python object per row and can be
+        # memory-mapped by readers.
+        embeddings = embeddings.astype(np.float16)
+
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        df.to_parquet(output_path, index=False)
+        np.save(self.embeddings_path(output_path), embeddings)
 
         logger.info(f"Article embeddings saved to {output_path}")
-        return df
+        return df, embeddings
+
+    @staticmethod
+    def embeddings_path(df_path):
+        """
+        Return the path of the embedding matrix stored next to `df_path`.
+        """
+        return os.path.splitext(df_path)[0] + ".npy"
+
+    @staticmethod
+    def load_article_embeddings(df_path):
+        """
+        Load article metadata and their embedding matrix.
+
+        The matrix is memory-mapped, so rows are read from disk on demand.
+        Legacy pickles with an `embedding` column are still supported.
+
+        Args:
+            df_path (str): Parquet metadata file (or a legacy .pkl file).
+
+        Returns:
+            tuple:
+                - pd.DataFrame: Article metadata
+                - np.ndarray: Embedding matrix (one row per article)
+        """
+        if df_path.endswith(".pkl"):
+            df = pd.read_pickle(df_path)
+            embeddings = np.vstack(df.pop("embedding").to_numpy())
+            return df, embeddings
+
+        df = pd.read_parquet(df_path)
+        embeddings = np.load(FeatureBuilder.embeddings_path(df_path), mmap_mode="r")
+        return df, embeddings
 
     # -------------------------------------------------------------------
     # Vector database ingestion
@@ -99,49 +272,58 @@ class FeatureBuilder:
         df_path,
         chroma_path,
         collection_name="articles_with_score",
-        batch_size=5000
+        batch_size=10_000
     ):
         """
         Load embedded articles into a persistent ChromaDB collection.
 
-        This method reads a pickle file containing article embeddings,
+        This method reads article metadata with their embedding matrix,
         initializes a persistent ChromaDB client, creates or retrieves
         the target collection, and uploads embeddings in batches.
         
         Args:
-            df_path (str): Path to the pickle file containing article embeddings.
+            df_path (str): Path to the article metadata file written by
+                create_article_embeddings().
             chroma_path (str): Directory for ChromaDB persistence.
             collection_name (str): Name of the target ChromaDB collection.
-            batch_size (int): Number of records uploaded per batch.
+            batch_size (int): Number of records uploaded per batch
+                (capped at the client's maximum batch size).
 
         Notes:
             - The method uses `tqdm` to display a progress bar for the upload.
             - Metadata for each article (year, citation count, government score)
-            is stored alongside the embedding vectors.
+            is stored alongside the embedding vectors, together with
+            `n_citation_log` (log1p of the citation count), so retrieval
+            does not recompute it for every query.
+            - Ids and metadata are prepared once as column arrays; each
+              batch only slices them (and the memory-mapped embeddings).
         """
         logger.info(f"Initializing ChromaDB at {chroma_path}")
-        df = pd.read_pickle(df_path)
+        df, emb_mat = self.load_article_embeddings(df_path)
 
         client = chromadb.PersistentClient(path=chroma_path)
         collection = client.get_or_create_collection(name=collection_name)
 
+        # Fewer, larger batches mean fewer SQLite commits
+        batch_size = min(batch_size, client.get_max_batch_size())
+
+        # BŁĄD: artykuły zostały zapisane kluczami wierszy a nie id (uuid)
+        ids_all = (df.index.to_numpy() + 1).astype(str)
+        titles_all = df["title"].to_numpy()
+        meta_df = df[["year", "n_citation", "gov_score"]].assign(
+            n_citation_log=np.log1p(df["n_citation"].to_numpy(dtype=np.float64))
+        )
+
         logger.info(f"Uploading {len(df)} records to ChromaDB")
 
         for i in tqdm(range(0, len(df), batch_size), desc="Chroma Upload"):
-            batch_df = df.iloc[i:i + batch_size]
+            batch = slice(i, i + batch_size)
 
             collection.add(
-                embeddings=[emb.tolist() for emb in batch_df["embedding"]],
-                documents=batch_df["title"].tolist(),
-                metadatas=[
-                    {
-                        "year": row["year"],
-                        "n_citation": row["n_citation"],
-                        "gov_score": row["gov_score"],
-                    }
-                    for _, row in batch_df.iterrows()
-                ],
-                ids=[str(idx + 1) for idx in batch_df.index] # BŁĄD: artykuły zostały zapisane kluczami wierszy a nie id (uuid)
+                embeddings=np.asarray(emb_mat[batch], dtype=np.float32),
+                documents=titles_all[batch].tolist(),
+                metadatas=meta_df.iloc[batch].to_dict(orient="records"),
+                ids=ids_all[batch].tolist()
             )
 
         logger.info("ChromaDB ingestion completed")
@@ -149,18 +331,25 @@ class FeatureBuilder:
     # -------------------------------------------------------------------
     # Query generation
     # -------------------------------------------------------------------
-    def generate_queries(self, raw_data_dir, limit=850_000):
+    def generate_queries(self, raw_data_dir, limit=850_000, seed=None):
         """
         Generate synthetic search queries from word lists.
 
+        Queries are drawn in large vectorized batches (one index array per
+        word category) and deduplicated with pd.unique. The first batch is
+        oversampled by the expected number of collisions, so a single pass
+        normally yields `limit` unique queries.
+
         Args:
             raw_data_dir (str): Directory containing word category CSV files.
             limit (int): Number of unique queries to generate.
+            seed (int, optional): Random seed for reproducible generation.
 
         Returns:
             pd.DataFrame: Generated queries.
         """
         logger.info("Generating synthetic queries")
+        start_time = time.perf_counter()
 
         categories = ["nouns", "verbs", "adjectives", "participles"]
         words = {}
@@ -168,63 +357,84 @@ class FeatureBuilder:
         for category in categories:
             path = os.path.join(raw_data_dir, f"{category}.csv")
             words[category] = (
-                pd.read_csv(path, header=None).iloc[:, 0].tolist()
+                pd.read_csv(path, header=None).iloc[:, 0]
+                .astype(str).to_numpy(dtype=object)
             )
 
-        generated = set()
-        pbar = tqdm(total=limit, desc="Query Generation")
+        # Number of distinct word combinations
+        combinations = float(np.prod([len(words[c]) for c in categories], dtype=float))
+        if limit > combinations:
+            raise ValueError(
+                f"Cannot generate {limit} unique queries from "
+                f"{int(combinations)} word combinations"
+            )
+
+        rng = np.random.default_rng(seed)
+        generated = np.empty(0, dtype=object)
 
         while len(generated) < limit:
-            query = (
-                f"{random.choice(words['nouns'])} "
-                f"{random.choice(words['verbs'])} "
-                f"{random.choice(words['adjectives'])} "
-                f"{random.choice(words['participles'])}"
-            )
+            # Expected draws to collect the missing queries among the unseen
+            # combinations (coupon collector), plus a small safety margin
+            missing = limit - len(generated)
+            unseen = combinations - len(generated)
+            expected_draws = -combinations * np.log1p(-missing / (unseen + 1))
+            batch_size = int(expected_draws * 1.01) + 1
+
+            queries = words[categories[0]][
+                rng.integers(0, len(words[categories[0]]), batch_size)
+            ]
+            for category in categories[1:]:
+                queries = queries + " " + words[category][
+                    rng.integers(0, len(words[category]), batch_size)
+                ]
+
+            # Hash-based, order-preserving dedupe (first occurrence wins)
+            generated = pd.unique(np.concatenate([generated, queries]))
 
-            if query not in generated:
-                generated.add(query)
-                pbar.update(1)
+        elapsed = time.perf_counter() - start_time
+        logger.info(f"Generated {limit} unique queries in {elapsed:.1f}s")
 
-        pbar.close()
-        return pd.DataFrame({"query": list(generated)})
+        return pd.DataFrame({"query": generated[:limit]})
 
     # -------------------------------------------------------------------
     # Query embedding pipeline
     # -------------------------------------------------------------------
-    def process_queries(self, raw_dir, output_path, batch_size=128):
+    def process_queries(self, raw_dir, output_path, batch_size=None):
         """
         Generate synthetic queries and compute their embeddings.
 
+        Query strings are written to `output_path` (Parquet) and the
+        embeddings to a companion float32 .npy matrix (see embeddings_path()),
+        so the experiment can memory-map them instead of unpickling
+        one array per query.
+
         Args:
             raw_dir (str): Directory with raw word lists.
-            output_path (str): Output pickle file.
-            batch_size (int): Encoding batch size.
+            output_path (str): Output Parquet file.
+            batch_size (int, optional): Encoding batch size.
         """
         df_queries = self.generate_queries(raw_dir)
 
         logger.info("Encoding query embeddings")
-        embeddings = self.model.encode(
-            df_queries["query"].tolist(),
-            batch_size=batch_size,
-            show_progress_bar=True
-        )
+        embeddings = self.encode_texts(df_queries["query"].tolist(), batch_size)
 
-        df_queries["embedding"] = list(embeddings)
-        df_queries.to_pickle(output_path)
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        df_queries.to_parquet(output_path, index=False)
+        np.save(self.embeddings_path(output_path), embeddings.astype(np.float32))
 
         logger.info(f"Query embeddings saved to {output_path}")
 
 
     def validate_collection(self, df_path, chroma_path, collection_name="articles_with_score"):
         """
-        Validate consistency between source DataFrame (.pkl) and ChromaDB collection.
+        Validate consistency between source article embeddings and ChromaDB collection.
 
         This method performs a health check to ensure that all articles
         from the source embeddings file are correctly loaded into ChromaDB.
 
         Args:
-            df_path (str): Path to the source pickle file with article embeddings.
+            df_path (str): Path to the article metadata file written by
+                create_article_embeddings().
             chroma_path (str): Directory of the persistent ChromaDB database.
             collection_name (str): Name of the ChromaDB collection to validate.
 
@@ -233,8 +443,8 @@ class FeatureBuilder:
         """
         logger.info(f"Checking integrity for collection: {collection_name}")
         
-        # Load the source DataFrame containing embeddings
-        df = pd.read_pickle(df_path)
+        # Load the source articles (embeddings stay memory-mapped)
+        df, _ = self.load_article_embeddings(df_path)
         expected_size = len(df)  # Number of expected records
         
         # Connect to ChromaDB and get the collection
@@ -256,12 +466,17 @@ class FeatureBuilder:
 if __name__ == "__main__":
     builder = FeatureBuilder()
 
-    ARTICLES_INTERIM = "data/interim/articles_with_score_df.csv"
-    TITLES_PICKLE = "data/interim/titles_with_embeddings.pkl"
+    ARTICLES_INTERIM = "data/interim/articles_with_score_df.parquet"
+    # Embedding matrix is stored next to it as titles_with_embeddings.npy
+    TITLES_EMBEDDINGS = "data/interim/titles_with_embeddings.parquet"
     CHROMA_DIR = "data/chroma"
     RAW_WORDS_DIR = "data/raw"
-    QUERIES_PICKLE = "data/interim/queries_with_embeddings.pkl"
-
-    builder.create_article_embeddings(ARTICLES_INTERIM, TITLES_PICKLE)
-    builder.load_to_chroma(TITLES_PICKLE, CHROMA_DIR)
-    builder.process_queries(RAW_WORDS_DIR, QUERIES_PICKLE)
+    # Embedding matrix is stored next to it as queries_with_embeddings.npy
+    QUERIES_EMBEDDINGS = "data/interim/queries_with_embeddings.parquet"
+    EMBEDDING_CACHE = "data/interim/embedding_cache"
+
+    builder.create_article_embeddings(
+        ARTICLES_INTERIM, TITLES_EMBEDDINGS, cache_dir=EMBEDDING_CACHE
+    )
+    builder.load_to_chroma(TITLES_EMBEDDINGS, CHROMA_DIR)
+    builder.process_queries(RAW_WORDS_DIR, QUERIES_EMBEDDINGS)
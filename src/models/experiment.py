@@ -8,11 +8,23 @@ large-scale simulation runs. It integrates the simulation engine
 (VirtualAggregator) with batching, checkpointing, and result persistence.
 """
 
+import io
 import os
 import csv
 import gc
+import mmap
+import queue
+import pickle
 import logging
+import threading
+import contextlib
+import collections
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import orjson
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import numpy as np
 from tqdm import tqdm
 
@@ -31,6 +43,424 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Queries submitted to the workers before the oldest one is collected
+MAX_QUERIES_IN_FLIGHT = 2
+
+# Candidates retrieved per query
+MAX_SIMILARITIES = 250
+
+# Maximum length of a candidate id stored in shared memory
+CANDIDATE_ID_WIDTH = 16
+
+# Query embeddings read ahead of the retrieval loop
+QUERY_PREFETCH = 64
+
+# Query embeddings copied from disk per read
+QUERY_CHUNK_SIZE = 1024
+# Queries sent to ChromaDB in a single `.query` call
+SEARCH_BATCH_SIZE = 32
+# Search batches retrieved ahead of the sampling loop
+SEARCH_PREFETCH = 2
+
+# Queries recorded between two checkpoints (also the capacity of the
+# preallocated per-configuration result buffers)
+CHECKPOINT_INTERVAL = 2500
+# Configurations per row group of global_distributions.parquet
+DISTRIBUTION_ROW_GROUP_SIZE = 16
+
+
+# -------------------------------------------------------------------
+# Configuration sweep helpers (shared by the main and worker processes)
+# -------------------------------------------------------------------
+def config_rng(global_query_id, settings_id):
+    """
+    Create the random generator of a single (query, configuration) pair.
+
+    The stream is the `settings_id`-th child of the query's SeedSequence
+    (the same stream SeedSequence.spawn() would hand out), so results do
+    not depend on how configurations are distributed across worker
+    processes, and no process-global RNG state is touched.
+    """
+    seed_sequence = np.random.SeedSequence(42 + global_query_id, spawn_key=(settings_id,))
+    return np.random.Generator(np.random.PCG64(seed_sequence))
+
+
+def config_parameters(settings):
+    """
+    Unpack configurations into (N, k, pn) tuples, once per run.
+
+    Returns:
+        list[tuple]: Arguments of VirtualAggregator.set_parameters()
+        ordered as `settings`.
+    """
+    return [(config["N"], config["k"], config["pn"]) for config in settings]
+
+
+def sample_config(aggregator, parameters, prepared_candidates, rng):
+    """
+    Run a single configuration on preprocessed candidates.
+
+    Args:
+        parameters (tuple): (N, k, pn), see config_parameters().
+        rng (np.random.Generator): Random generator used for sampling.
+
+    Returns:
+        collections.Counter: Sampled paper distribution.
+    """
+    aggregator.set_parameters(*parameters)
+    return aggregator.rank_and_sample(prepared_candidates, rng)
+
+
+def run_config_slice(aggregator, parameters, settings_ids, global_query_id,
+                     prepared_candidates):
+    """
+    Run a slice of configurations for one query.
+
+    Args:
+        parameters (list[tuple]): Parameters of all configurations,
+            see config_parameters().
+
+    Returns:
+        list[collections.Counter]: Distributions ordered as `settings_ids`.
+    """
+    distributions = []
+    for settings_id in settings_ids:
+        distributions.append(sample_config(
+            aggregator, parameters[settings_id], prepared_candidates,
+            config_rng(global_query_id, settings_id)
+        ))
+    return distributions
+
+
+def _candidate_views(buffer, max_candidates):
+    """
+    Map the candidate arrays of one shared memory slot.
+
+    Layout: candidate features (float32, 4 columns, see
+    VirtualAggregator.prepare_candidates), ids (fixed-width unicode).
+
+    Returns:
+        tuple: (features, ids) array views.
+    """
+    features = np.ndarray((max_candidates, 4), dtype=np.float32, buffer=buffer)
+    ids = np.ndarray(
+        (max_candidates,), dtype=f"<U{CANDIDATE_ID_WIDTH}",
+        buffer=buffer, offset=features.nbytes
+    )
+    return features, ids
+
+
+def _candidate_slot_size(max_candidates):
+    """
+    Return the size in bytes of one shared candidate slot.
+    """
+    return max_candidates * (4 * 4 + 4 * CANDIDATE_ID_WIDTH)
+
+
+def _config_worker(worker_id, parameters, settings_ids, slots,
+                   max_candidates, tasks, results):
+    """
+    Worker process loop pinned to a fixed slice of configurations.
+
+    Receives (global_query_id, slot_id, n_candidates) items until a None
+    sentinel arrives and answers each with its slice of distributions.
+    Candidates are read in place from the shared memory slot.
+    """
+    try:
+        aggregator = VirtualAggregator(connect=False)
+        views = [_candidate_views(slot.buf, max_candidates) for slot in slots]
+
+        for global_query_id, slot_id, n_candidates in iter(tasks.get, None):
+            features, ids = views[slot_id]
+            prepared_candidates = {
+                "ids": ids[:n_candidates],
+                "features": features[:n_candidates],
+                "rankings": {}
+            }
+            results.put((worker_id, global_query_id, run_config_slice(
+                aggregator, parameters, settings_ids,
+                global_query_id, prepared_candidates
+            )))
+    except Exception as e:
+        results.put((worker_id, None, e))
+
+
+class ConfigWorkerPool:
+    """
+    Long-lived worker processes, each owning a fixed slice of the settings.
+
+    Queries are broadcast once to every worker, so configurations are
+    bound (and pickled) only at start-up. Candidate arrays are written
+    once per query into a ring of preallocated shared memory slots, and
+    only (query id, slot id, size) goes through the task queues. Several
+    queries may be in flight at once, which overlaps retrieval in the
+    main process with sampling in the workers. With a single worker the
+    sweep runs inline.
+    """
+
+    def __init__(self, settings, n_workers, aggregator=None,
+                 max_candidates=MAX_SIMILARITIES,
+                 max_in_flight=MAX_QUERIES_IN_FLIGHT):
+        """
+        Args:
+            settings (list[dict]): Simulation parameter configurations.
+            n_workers (int): Number of worker processes.
+            aggregator (VirtualAggregator, optional): Aggregator used for
+                inline sampling when n_workers is 1.
+            max_candidates (int): Maximum number of candidates per query.
+            max_in_flight (int): Maximum number of queries submitted
+                but not yet collected.
+        """
+        self.parameters = config_parameters(settings)
+        # Configurations sharing a weight vector go to the same worker, which
+        # then ranks each query once per vector (see rank_and_sample)
+        by_weights = sorted(
+            range(len(settings)), key=lambda i: tuple(settings[i]["pn"])
+        )
+        self.settings_chunks = [
+            chunk.tolist()
+            for chunk in np.array_split(
+                np.array(by_weights, dtype=np.int64), n_workers
+            )
+        ]
+        self.aggregator = aggregator
+        self.max_candidates = max_candidates
+        self.processes = []
+        self.task_queues = []
+        self.pending = {}
+        self.slots = []
+        self.slot_views = []
+        self.next_slot = 0
+
+        if n_workers == 1:
+            return
+
+        # One slot more than the in-flight limit: a slot is rewritten only
+        # after every worker has answered the query that used it
+        for _ in range(max_in_flight + 1):
+            slot = shared_memory.SharedMemory(
+                create=True, size=_candidate_slot_size(max_candidates)
+            )
+            self.slots.append(slot)
+            self.slot_views.append(_candidate_views(slot.buf, max_candidates))
+
+        ctx = mp.get_context()
+        self.results = ctx.Queue()
+        for worker_id, chunk in enumerate(self.settings_chunks):
+            tasks = ctx.Queue()
+            process = ctx.Process(
+                target=_config_worker,
+                args=(
+                    worker_id, self.parameters, chunk, self.slots,
+                    max_candidates, tasks, self.results
+                ),
+                daemon=True
+            )
+            process.start()
+            self.task_queues.append(tasks)
+            self.processes.append(process)
+
+    def submit(self, global_query_id, prepared_candidates):
+        """
+        Schedule all configurations of a query.
+        """
+        if not self.processes:
+            self.pending[global_query_id] = run_config_slice(
+                self.aggregator, self.parameters, self.settings_chunks[0],
+                global_query_id, prepared_candidates
+            )
+            return
+
+        if len(self.pending) >= len(self.slots):
+            raise RuntimeError(
+                "Too many queries in flight for the shared memory slots"
+            )
+
+        ids = prepared_candidates["ids"]
+        n_candidates = len(ids)
+        if n_candidates > self.max_candidates:
+            raise ValueError(
+                f"Expected at most {self.max_candidates} candidates, "
+                f"got {n_candidates}"
+            )
+        # A numpy string array is as wide as its longest id
+        if ids.dtype.itemsize > np.dtype(f"<U{CANDIDATE_ID_WIDTH}").itemsize:
+            raise ValueError(
+                f"Candidate ids longer than {CANDIDATE_ID_WIDTH} characters"
+            )
+
+        slot_id = self.next_slot
+        self.next_slot = (self.next_slot + 1) % len(self.slots)
+
+        features, slot_ids = self.slot_views[slot_id]
+        features[:n_candidates] = prepared_candidates["features"]
+        slot_ids[:n_candidates] = ids
+
+        self.pending[global_query_id] = [None] * len(self.processes)
+        for tasks in self.task_queues:
+            tasks.put((global_query_id, slot_id, n_candidates))
+
+    def collect(self, global_query_id):
+        """
+        Wait for a submitted query and return its distributions.
+
+        Returns:
+            list[collections.Counter]: Distributions ordered as settings.
+        """
+        if not self.processes:
+            return self._in_settings_order([self.pending.pop(global_query_id)])
+
+        parts = self.pending[global_query_id]
+        while any(part is None for part in parts):
+            try:
+                worker_id, query_id, distributions = self.results.get(
+                    timeout=10
+                )
+            except queue.Empty:
+                if not all(process.is_alive() for process in self.processes):
+                    raise RuntimeError(
+                        "A configuration worker exited unexpectedly"
+                    )
+                continue
+
+            if query_id is None:
+                raise RuntimeError(
+                    f"Configuration worker {worker_id} failed"
+                ) from distributions
+            self.pending[query_id][worker_id] = distributions
+
+        del self.pending[global_query_id]
+        return self._in_settings_order(parts)
+
+    def _in_settings_order(self, parts):
+        """
+        Merge per-chunk distributions back into settings order.
+        """
+        distributions = [None] * len(self.parameters)
+        for chunk, part in zip(self.settings_chunks, parts):
+            for settings_id, distribution in zip(chunk, part):
+                distributions[settings_id] = distribution
+        return distributions
+
+    def close(self):
+        """
+        Stop the worker processes.
+        """
+        for tasks in self.task_queues:
+            tasks.put(None)
+        for process in self.processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+
+        # Views must be released before the shared memory can be closed
+        self.slot_views = []
+        for slot in self.slots:
+            slot.close()
+            slot.unlink()
+        self.slots = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class BackgroundWriter:
+    """
+    Run persistence calls in submission order on a single background thread.
+
+    File writes and compression release the GIL, so checkpoints overlap
+    with retrieval and sampling. The first error raised by a call is
+    re-raised by the next submit() or by close(); later calls are skipped.
+    """
+
+    def __init__(self, max_pending=2):
+        """
+        Args:
+            max_pending (int): Calls queued before submit() blocks (bounds
+                the number of checkpoint snapshots held in memory).
+        """
+        self.tasks = queue.Queue(maxsize=max_pending)
+        self.error = None
+        self.thread = threading.Thread(
+            target=self._run, name="checkpoint-writer", daemon=True
+        )
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            task = self.tasks.get()
+            if task is None:
+                return
+            if self.error is None:
+                func, args = task
+                try:
+                    func(*args)
+                except BaseException as exc:
+                    self.error = exc
+
+    def _raise_error(self):
+        if self.error is not None:
+            raise self.error
+
+    def submit(self, func, *args):
+        """
+        Queue `func(*args)` for execution on the writer thread.
+        """
+        self._raise_error()
+        self.tasks.put((func, args))
+
+    def close(self):
+        """
+        Wait for all queued calls to finish.
+        """
+        if self.thread.is_alive():
+            self.tasks.put(None)
+            self.thread.join()
+        self._raise_error()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            self.close()
+        except BaseException:
+            # Keep the exception the caller is already unwinding with
+            if exc_type is None:
+                raise
+            logger.exception("Background writer failed during another error")
+
+
+def prefetch(iterable, maxsize=QUERY_PREFETCH):
+    """
+    Iterate over `iterable` in a background thread, up to `maxsize` items ahead.
+
+    Exceptions raised by the producer are re-raised in the consumer.
+    """
+    buffer = queue.Queue(maxsize=maxsize)
+    done = object()
+
+    def produce():
+        try:
+            for item in iterable:
+                buffer.put((True, item))
+            buffer.put((True, done))
+        except BaseException as exc:
+            buffer.put((False, exc))
+
+    threading.Thread(target=produce, name="query-prefetch", daemon=True).start()
+
+    while True:
+        ok, item = buffer.get()
+        if not ok:
+            raise item
+        if item is done:
+            return
+        yield item
+
 
 # -------------------------------------------------------------------
 # Experiment orchestrator
@@ -41,15 +471,35 @@ class Experiment:
     and parameter configurations.
     """
 
-    def __init__(self, settings):
+    def __init__(self, settings, n_workers=None, to_csv=False,
+                 chroma_host=None, chroma_port=8000):
         """
         Initialize the experiment.
 
         Args:
             settings (list[dict]): List of simulation parameter configurations.
+            n_workers (int, optional): Number of processes sampling
+                configurations in parallel (defaults to the number of CPUs;
+                1 runs everything in the main process).
+            to_csv (bool): Write per-configuration results to results.csv
+                instead of Parquet parts (see save_results).
+            chroma_host (str | None): Host of a ChromaDB server to query
+                instead of the local data/chroma database.
+            chroma_port (int): Port of the ChromaDB server.
         """
-        self.virtual_aggregator = VirtualAggregator()
+        self.virtual_aggregator = VirtualAggregator(
+            chroma_host=chroma_host, chroma_port=chroma_port
+        )
         self.settings = settings
+        # Keys of the global distributions, formatted once per run
+        self.config_keys = [str(config) for config in settings]
+        self.parameters = config_parameters(settings)
+        self.n_workers = max(1, min(n_workers or os.cpu_count() or 1, len(settings)))
+        self.to_csv = to_csv
+        # Open results.csv handles and row counts per settings_id
+        # (see save_results)
+        self.result_files = {}
+        self.result_counts = {}
         self.queries = None
         self.similar_articles = None
 
@@ -59,16 +509,56 @@ class Experiment:
     def load_queries(self):
         """
         Load precomputed query embeddings.
+
+        The (N, D) matrix is memory-mapped, so indexing a query returns a
+        zero-copy row view. Legacy pickles are still supported.
         """
+        path = "data/interim/queries_with_embeddings.npy"
+        if os.path.exists(path):
+            logger.info(f"Loading queries from {path}")
+            self.queries = np.load(path, mmap_mode="r")
+            return
+
         path = "data/interim/queries_with_embeddings.pkl"
         logger.info(f"Loading queries from {path}")
 
         df_queries = pd.read_pickle(path)[["embedding"]]
-        self.queries = df_queries["embedding"].tolist()
+        self.queries = np.stack(df_queries["embedding"].to_numpy()).astype(np.float32)
 
         del df_queries
         gc.collect()
 
+    def iter_queries(self, start, end, chunk_size=QUERY_CHUNK_SIZE):
+        """
+        Yield query embeddings `start`..`end` in order.
+
+        Rows are copied from the (memory-mapped) matrix one chunk at a
+        time, so only a small window is resident while the queries are
+        processed.
+        """
+        for chunk_start in range(start, end, chunk_size):
+            chunk = np.array(self.queries[chunk_start:min(chunk_start + chunk_size, end)])
+            yield from chunk
+
+    def iter_search_results(self, start, end, batch_size=SEARCH_BATCH_SIZE):
+        """
+        Yield ChromaDB responses for queries `start`..`end` in order.
+
+        Embeddings are read ahead in a background thread and searched
+        `batch_size` at a time, one ChromaDB roundtrip per batch.
+        """
+        embeddings = prefetch(self.iter_queries(start, end))
+        while True:
+            batch = [
+                embedding for _, embedding in zip(range(batch_size), embeddings)
+            ]
+            if not batch:
+                return
+            yield from self.virtual_aggregator.get_similar_articles_batch(
+                batch,
+                max_similarities=MAX_SIMILARITIES
+            )
+
     # -------------------------------------------------------------------
     # Experiment execution
     # -------------------------------------------------------------------
@@ -76,6 +566,13 @@ class Experiment:
         """
         Run the experiment for a batch of queries.
 
+        Configurations are sampled by long-lived worker processes, each
+        pinned to a fixed slice of the settings (see ConfigWorkerPool).
+        Retrieval, buffering and persistence stay in the main process,
+        which keeps a few queries in flight to overlap I/O with sampling.
+        Query embeddings are read from disk, searched in ChromaDB, and
+        checkpoints written, by background threads.
+
         Args:
             batch (int): Number of queries processed in a single run.
         """
@@ -83,12 +580,24 @@ class Experiment:
         self.load_queries()
 
         progress_status = self.health_check()
-        # Resume progress based on the first configuration
-        already_saved = int(progress_status.get(0, {}).get("controll_sum", 0) or 0)
+        # Resume from the configuration with the fewest saved results; the
+        # ones ahead of it (a run stopped in the middle of a checkpoint)
+        # skip buffering the queries they already saved
+        result_starts = [
+            progress_status.get(settings_id, {}).get("controll_sum", 0)
+            for settings_id in range(len(self.settings))
+        ]
+        already_saved = min(result_starts, default=0)
 
         logger.info(f"Skipping already processed queries: {already_saved}")
+        if max(result_starts, default=0) > already_saved:
+            logger.warning(
+                f"Configurations have between {already_saved} and "
+                f"{max(result_starts)} saved results, "
+                f"catching up from {already_saved}"
+            )
 
-        distribution_dict = {}
+        distribution_dict = self.load_checkpoint(already_saved)
         result_buffer = {}
         processed = 0
 
@@ -96,128 +605,444 @@ class Experiment:
         end_index = min(start_index + batch, len(self.queries))
 
         logger.info(f"Processing query range: {start_index}–{end_index}")
+        if self.n_workers > 1:
+            logger.info(f"Sampling configurations in {self.n_workers} worker processes")
 
-        for query_offset, query_embedding in enumerate(
-            tqdm(self.queries[start_index:end_index], desc="Queries")
-        ):
-            # Ensure deterministic randomness across batches
-            global_query_id = start_index + query_offset
-            np.random.seed(hash(str(42 + global_query_id)) % (2**32 - 1))
-
-            # Retrieve top-N similar articles (single I/O-heavy operation per query)
-            self.similar_articles = self.virtual_aggregator.get_similar_articles(
-                query_embedding,
-                max_similarities=250
-            )
+        # Result files are closed (finally) after the writer has flushed,
+        # also when the run fails
+        with contextlib.closing(self), ConfigWorkerPool(
+            self.settings, self.n_workers, self.virtual_aggregator,
+            max_candidates=MAX_SIMILARITIES
+        ) as pool, BackgroundWriter() as writer:
+            in_flight = collections.deque()
 
-            # Preprocess candidate features once per query
-            prepared_candidates = self.virtual_aggregator.prepare_candidates(
-                self.similar_articles
+            # Top-N similar articles, retrieved in batches of queries by a
+            # background thread while the current ones are sampled
+            search_results = prefetch(
+                self.iter_search_results(start_index, end_index),
+                maxsize=SEARCH_PREFETCH * SEARCH_BATCH_SIZE
             )
 
-            # Iterate over all parameter configurations
-            for settings_id, config in enumerate(self.settings):
-                self.virtual_aggregator.set_parameters(
-                    config["N"],
-                    config["k"],
-                    config["pn"]
+            for query_offset, similar_articles in enumerate(
+                tqdm(
+                    search_results, total=end_index - start_index,
+                    desc="Queries"
                 )
+            ):
+                global_query_id = start_index + query_offset
+                self.similar_articles = similar_articles
 
-                step_distribution = self.step(prepared_candidates)
-
-                # Buffer per-query results
-                if settings_id not in result_buffer:
-                    result_buffer[settings_id] = {
-                        "query_id": [global_query_id],
-                        "distribution": [dict(step_distribution)]
-                    }
-                else:
-                    result_buffer[settings_id]["query_id"].append(global_query_id)
-                    result_buffer[settings_id]["distribution"].append(
-                        dict(step_distribution)
-                    )
+                # Preprocess candidate features once per query
+                prepared_candidates = self.virtual_aggregator.prepare_candidates(
+                    self.similar_articles
+                )
 
-                # Aggregate global distributions
-                settings_key = str(config)
-                if settings_key in distribution_dict:
-                    distribution_dict[settings_key].update(step_distribution)
-                else:
-                    distribution_dict[settings_key] = step_distribution
+                # Run all parameter configurations (deterministic per query
+                # and configuration, independent of the number of workers)
+                pool.submit(global_query_id, prepared_candidates)
+                in_flight.append(global_query_id)
 
-            processed += 1
+                # Record queries in order, once the pipeline window is full
+                # (or at the end of the range)
+                is_last = query_offset == end_index - start_index - 1
+                while in_flight and (
+                    len(in_flight) > MAX_QUERIES_IN_FLIGHT or is_last
+                ):
+                    finished_query_id = in_flight.popleft()
+                    self.record_query(
+                        finished_query_id,
+                        pool.collect(finished_query_id),
+                        result_buffer,
+                        distribution_dict,
+                        result_starts
+                    )
+                    processed += 1
 
-            # Periodic checkpointing
-            if processed % 2500 == 0:
-                self.save_distribution(distribution_dict)
-                self.save_results(result_buffer)
-                result_buffer = {}
+                    # Periodic checkpointing: hand a snapshot over to the
+                    # writer thread and keep sampling into fresh buffers
+                    if processed % CHECKPOINT_INTERVAL == 0:
+                        writer.submit(self.save_results, result_buffer)
+                        writer.submit(self.save_checkpoint, {
+                            key: dist.copy()
+                            for key, dist in distribution_dict.items()
+                        }, finished_query_id + 1)
+                        result_buffer = {}
 
-        logger.info("Final result persistence")
-        self.save_distribution(distribution_dict)
-        self.save_results(result_buffer)
+            logger.info("Final result persistence")
+            writer.submit(self.save_results, result_buffer)
+            writer.submit(self.save_checkpoint, distribution_dict, end_index)
+            writer.submit(self.save_distribution, distribution_dict)
 
-    # -------------------------------------------------------------------
-    # Single simulation step
-    # -------------------------------------------------------------------
-    def step(self, prepared_candidates):
+    def record_query(self, global_query_id, step_distributions, result_buffer,
+                     distribution_dict, result_starts=None):
         """
-        Execute a single aggregation step using preprocessed candidates.
+        Buffer per-query results and aggregate global distributions.
 
-        Returns:
-            collections.Counter: Sampled paper distribution.
+        Args:
+            global_query_id (int): Query index.
+            step_distributions (list[collections.Counter]): Distributions
+                ordered as self.settings.
+            result_buffer (dict): Per-configuration result buffers: a
+                preallocated query id array, a distribution list and the
+                number of rows filled.
+            distribution_dict (dict): Global distributions per configuration.
+            result_starts (list[int], optional): Per-configuration number of
+                saved results; earlier queries are aggregated but not
+                buffered again.
         """
-        return self.virtual_aggregator.rank_and_sample(prepared_candidates)
+        for settings_id, (settings_key, step_distribution) in enumerate(
+            zip(self.config_keys, step_distributions)
+        ):
+            # Aggregate global distributions (into a fresh Counter, so the
+            # buffered per-query distribution is never mutated)
+            if settings_key in distribution_dict:
+                distribution_dict[settings_key].update(step_distribution)
+            else:
+                distribution_dict[settings_key] = collections.Counter(
+                    step_distribution
+                )
+
+            # Results this configuration has already saved
+            if result_starts and global_query_id < result_starts[settings_id]:
+                continue
+
+            # Buffer per-query results (the Counter itself; it is only
+            # serialized when the buffer is flushed)
+            buffer = result_buffer.get(settings_id)
+            if buffer is None:
+                buffer = result_buffer[settings_id] = {
+                    "query_id": np.empty(CHECKPOINT_INTERVAL, dtype=np.int64),
+                    "distribution": [None] * CHECKPOINT_INTERVAL,
+                    "size": 0
+                }
+
+            position = buffer["size"]
+            buffer["query_id"][position] = global_query_id
+            buffer["distribution"][position] = step_distribution
+            buffer["size"] = position + 1
 
     # -------------------------------------------------------------------
     # Persistence
     # -------------------------------------------------------------------
     def save_results(self, result_dict):
         """
-        Save per-configuration simulation results to CSV files.
+        Save per-configuration simulation results.
+
+        By default every flush writes one Parquet part per configuration
+        (data/results/{settings_id}/part-{first_query_id}.parquet): query
+        ids and their distributions as a MAP<string, int32> column,
+        zstd-compressed. Parts are written to a temporary file and renamed,
+        so an interrupted run never leaves a truncated file behind.
+
+        With `to_csv` the rows are appended to results.csv instead, as in
+        earlier runs (distributions serialized as JSON objects).
+
+        After each write the row count is recorded in _controll_sum.txt,
+        so health_check() does not have to rescan the results.
         """
-        for settings_id, data in result_dict.items():
-            if not data["query_id"]:
+        for settings_id, buffer in result_dict.items():
+            size = buffer["size"]
+            if not size:
                 continue
-            
+
+            data = {
+                "query_id": buffer["query_id"][:size],
+                "distribution": buffer["distribution"][:size]
+            }
+
+            if settings_id not in self.result_counts:
+                self.result_counts[settings_id] = self._count_results(
+                    settings_id
+                )
+
+            if self.to_csv:
+                file_size = self._append_csv_rows(settings_id, data)
+            else:
+                self._write_parquet_part(settings_id, data)
+                file_size = None
+
+            self.result_counts[settings_id] += size
+            self._write_controll_sum(
+                settings_id, self.result_counts[settings_id], file_size
+            )
+
+    @staticmethod
+    def _write_parquet_part(settings_id, data):
+        """
+        Write the buffered rows of a configuration as a new Parquet part.
+        """
+        distributions = data["distribution"]
+        offsets = np.zeros(len(distributions) + 1, dtype=np.int32)
+        np.cumsum([len(dist) for dist in distributions], out=offsets[1:])
+
+        table = pa.table({
+            "query_id": pa.array(data["query_id"], type=pa.int64()),
+            "distribution": pa.MapArray.from_arrays(
+                offsets,
+                pa.array(
+                    [paper_id for dist in distributions for paper_id in dist],
+                    type=pa.string()
+                ),
+                pa.array(
+                    [
+                        count
+                        for dist in distributions for count in dist.values()
+                    ],
+                    type=pa.int32()
+                ),
+            ),
+        })
+
+        directory = f"data/results/{settings_id}"
+        os.makedirs(directory, exist_ok=True)
+
+        # Readers of the directory skip dot-prefixed files
+        part_path = Experiment._part_path(settings_id, data["query_id"][0])
+        tmp_path = os.path.join(
+            directory, "." + os.path.basename(part_path) + ".tmp"
+        )
+        pq.write_table(
+            table, tmp_path, compression="zstd", compression_level=3
+        )
+        os.replace(tmp_path, part_path)
+
+    @staticmethod
+    def _part_path(settings_id, first_query_id):
+        """
+        Return the path of the Parquet part starting at `first_query_id`.
+        """
+        return f"data/results/{settings_id}/part-{first_query_id:09d}.parquet"
+
+    def _append_csv_rows(self, settings_id, data):
+        """
+        Append the buffered rows of a configuration to its results.csv.
+
+        The rows are serialized in memory first and appended with a single
+        write, then flushed to disk.
+
+        Returns:
+            int: Size of the results file after the write.
+        """
+        rows = io.StringIO()
+        csv.writer(rows).writerows(zip(
+            data["query_id"],
+            (orjson.dumps(dist).decode() for dist in data["distribution"])
+        ))
+
+        results_file = self._results_file(settings_id)
+        results_file.write(rows.getvalue().encode())
+        results_file.flush()
+        return results_file.tell()
+
+    def _results_file(self, settings_id):
+        """
+        Return the results file of a configuration, opening it in append
+        mode (and writing the header for a new file) on first use.
+        """
+        if settings_id not in self.result_files:
             directory = f"data/results/{settings_id}"
             os.makedirs(directory, exist_ok=True)
 
             file_path = f"{directory}/results.csv"
             file_exists = os.path.isfile(file_path)
 
-            with open(file_path, "a", newline="") as csvfile:
-                writer = csv.DictWriter(
-                    csvfile,
-                    fieldnames=["query_id", "distribution"]
-                )
+            results_file = open(file_path, "ab")
+            if not file_exists:
+                results_file.write(b"query_id,distribution\r\n")
+
+            self.result_files[settings_id] = results_file
 
-                if not file_exists:
-                    writer.writeheader()
+        return self.result_files[settings_id]
+
+    @staticmethod
+    def _write_controll_sum(settings_id, row_count, file_size=None):
+        """
+        Atomically record the row count of a configuration's results
+        (and, for results.csv, the file size it corresponds to).
+        """
+        path = f"data/results/{settings_id}/_controll_sum.txt"
+        with open(path + ".tmp", "w") as file:
+            if file_size is None:
+                file.write(f"{row_count}\n")
+            else:
+                file.write(f"{row_count} {file_size}\n")
+        os.replace(path + ".tmp", path)
 
-                for i in range(len(data["query_id"])):
-                    writer.writerow({
-                        "query_id": data["query_id"][i],
-                        "distribution": data["distribution"][i],
-                    })
+    @staticmethod
+    def _read_controll_sum(settings_id):
+        """
+        Return the values stored in _controll_sum.txt, or None if the
+        counter is missing or unreadable.
+        """
+        path = f"data/results/{settings_id}/_controll_sum.txt"
+        try:
+            with open(path) as file:
+                return [int(value) for value in file.read().split()]
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _count_results(self, settings_id):
+        """
+        Return the number of rows stored for a configuration.
+
+        The counter in _controll_sum.txt is used while it is still valid:
+        for Parquet parts, as long as no part starts at the recorded row
+        count; for results.csv, while the file size matches. Otherwise
+        (missing counter, or a write interrupted before the counter was
+        updated) the rows are counted from the Parquet footers, or from
+        the newlines of results.csv in a memory map.
+        """
+        if self.to_csv:
+            return self._count_csv_results(settings_id)
+
+        counter = self._read_controll_sum(settings_id)
+        if counter and not os.path.exists(
+            self._part_path(settings_id, counter[0])
+        ):
+            return counter[0]
+
+        directory = f"data/results/{settings_id}"
+        if not os.path.isdir(directory):
+            return 0
+
+        return sum(
+            pq.read_metadata(os.path.join(directory, name)).num_rows
+            for name in os.listdir(directory)
+            if name.startswith("part-") and name.endswith(".parquet")
+        )
+
+    def _count_csv_results(self, settings_id):
+        """
+        Return the number of rows stored in a configuration's results.csv.
+        """
+        file_path = f"data/results/{settings_id}/results.csv"
+        try:
+            file_size = os.stat(file_path).st_size
+        except FileNotFoundError:
+            return 0
+
+        counter = self._read_controll_sum(settings_id)
+        if counter and len(counter) == 2 and counter[1] == file_size:
+            return counter[0]
+
+        if file_size == 0:
+            return 0
+
+        chunk = 1 << 24
+        with open(file_path, "rb") as file, \
+                mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            line_count = sum(
+                mapped[offset:offset + chunk].count(b"\n")
+                for offset in range(0, file_size, chunk)
+            )
+        # The first line is the header
+        return max(0, line_count - 1)
+
+    def close(self):
+        """
+        Close the results files kept open by save_results().
+        """
+        for results_file in self.result_files.values():
+            results_file.close()
+        self.result_files = {}
+        self.result_counts = {}
 
     def save_distribution(self, distribution_dict):
         """
         Save aggregated global distributions across all configurations.
+
+        Each distribution is stored as two aligned Parquet list columns
+        (paper_ids, counts), so readers never parse serialized dicts.
+        The columns are built from flat arrays and one offsets array, with
+        no intermediate list object per configuration.
         """
-        df = pd.DataFrame(
-            list(distribution_dict.items()),
-            columns=["settings", "distribution"]
-        )
-        df["distribution"] = df["distribution"].apply(dict)
+        distributions = distribution_dict.values()
+        offsets = np.zeros(len(distribution_dict) + 1, dtype=np.int32)
+        np.cumsum([len(dist) for dist in distributions], out=offsets[1:])
 
-        df.to_csv(
-            "data/processed/global_distributions.csv",
-            index=False
+        table = pa.table({
+            "settings": pa.array(list(distribution_dict.keys()), type=pa.string()),
+            "paper_ids": pa.ListArray.from_arrays(offsets, pa.array(
+                [paper_id for dist in distributions for paper_id in dist],
+                type=pa.string()
+            )),
+            "counts": pa.ListArray.from_arrays(offsets, pa.array(
+                [count for dist in distributions for count in dist.values()],
+                type=pa.int64()
+            )),
+        })
+
+        os.makedirs("data/processed", exist_ok=True)
+        # Small row groups let readers stream a few configurations at a
+        # time (see visualization.visualize.iter_results)
+        pq.write_table(
+            table,
+            "data/processed/global_distributions.parquet",
+            row_group_size=DISTRIBUTION_ROW_GROUP_SIZE,
+            compression="zstd",
+            compression_level=3
         )
 
+    def save_checkpoint(self, distribution_dict, processed_until):
+        """
+        Pickle the running global distributions for crash recovery.
+
+        The global distributions file itself is only written at the end of
+        a run; in between, the raw dict is pickled, which is much cheaper
+        than building the Parquet table.
+
+        Args:
+            distribution_dict (dict): Global distributions per configuration.
+            processed_until (int): Number of queries aggregated into them.
+        """
+        path = "data/interim/distribution_checkpoint.pkl"
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".tmp", "wb") as file:
+            pickle.dump(
+                {
+                    "processed_until": processed_until,
+                    "distributions": distribution_dict
+                },
+                file,
+                protocol=pickle.HIGHEST_PROTOCOL
+            )
+        os.replace(path + ".tmp", path)
+
     # -------------------------------------------------------------------
     # Progress recovery
     # -------------------------------------------------------------------
+    def load_checkpoint(self, already_saved):
+        """
+        Restore the global distributions aggregated by previous runs.
+
+        Returns:
+            dict: Global distributions per configuration (empty when there
+            is no checkpoint matching the saved results).
+        """
+        path = "data/interim/distribution_checkpoint.pkl"
+        if not already_saved:
+            return {}
+
+        try:
+            with open(path, "rb") as file:
+                checkpoint = pickle.load(file)
+        except FileNotFoundError:
+            logger.warning(
+                "No distribution checkpoint found, "
+                "global distributions restart empty"
+            )
+            return {}
+
+        if checkpoint["processed_until"] != already_saved:
+            logger.warning(
+                "Distribution checkpoint covers "
+                f"{checkpoint['processed_until']} queries but {already_saved} "
+                "results are saved, global distributions restart empty"
+            )
+            return {}
+
+        return checkpoint["distributions"]
+
     def health_check(self):
         """
         Check how many queries have already been processed per configuration.
@@ -232,13 +1057,7 @@ class Experiment:
             return results
 
         for idx in range(len(self.settings)):
-            file_path = os.path.join(base_path, str(idx), "results.csv")
-            try:
-                with open(file_path, "r") as file:
-                    line_count = sum(1 for _ in file) - 1
-                    results[idx] = {"controll_sum": max(0, line_count)}
-            except FileNotFoundError:
-                results[idx] = {"controll_sum": 0}
+            results[idx] = {"controll_sum": self._count_results(idx)}
 
         return results
 
@@ -264,22 +1083,19 @@ class Experiment:
         else:
             query_embedding = query_id_or_embedding
 
-        np.random.seed(seed)
+        rng = np.random.default_rng(seed)
 
         raw_results = self.virtual_aggregator.get_similar_articles(
             query_embedding,
-            max_similarities=250
+            max_similarities=MAX_SIMILARITIES
         )
 
         prepared_candidates = self.virtual_aggregator.prepare_candidates(raw_results)
 
         test_results = {}
-        for settings_id, config in enumerate(self.settings):
-            self.virtual_aggregator.set_parameters(
-                config["N"],
-                config["k"],
-                config["pn"]
+        for settings_id, parameters in enumerate(self.parameters):
+            test_results[settings_id] = sample_config(
+                self.virtual_aggregator, parameters, prepared_candidates, rng
             )
-            test_results[settings_id] = self.step(prepared_candidates)
 
         return test_results
@@ -14,12 +14,198 @@ The engine operates on a persistent ChromaDB collection and produces
 a probabilistic distribution of selected papers.
 """
 
+import time
+import functools
+import threading
 import collections
 import numpy as np
 import pandas as pd
 import joblib
 import chromadb
-import random
+
+try:
+    from numba import njit
+except ImportError:
+    # Optional: without numba the sampling loop runs as plain Python
+    njit = None
+
+# Pages kept for sampling beyond the ones a sample can empty: while 30
+# non-empty pages precede it, a page is drawn with probability below
+# exp(-30) per draw. A sample of k papers empties at most k / N pages, so
+# candidates ranked below N * MAX_EFFECTIVE_PAGES + k are not sorted.
+MAX_EFFECTIVE_PAGES = 30
+
+# ChromaDB responses kept for repeated query embeddings
+QUERY_CACHE_SIZE = 256
+
+
+# -------------------------------------------------------------------
+# Sampling kernel
+# -------------------------------------------------------------------
+def _sample_positions(ranked, page_sizes, page_size, page_weights,
+                      page_uniforms, paper_uniforms, next_page, prev_page,
+                      selected):
+    """
+    Draw papers from ranked pages without replacement.
+
+    Works on plain integer sequences only, so the same code runs compiled
+    by numba (on numpy arrays) or as Python (on lists), with identical
+    results.
+
+    Args:
+        ranked: Candidate positions in rank order; page p occupies
+            [p * page_size, p * page_size + page_sizes[p]). Modified in place.
+        page_sizes: Live size of every page. Modified in place.
+        page_size (int): Nominal page size N.
+        page_weights: Cumulative page weights, page_weights[j] being the sum
+            of exp(-x) for x = 1..j+1 (see VirtualAggregator.page_weights()).
+        page_uniforms, paper_uniforms: One uniform in [0, 1) per draw,
+            selecting the page and the paper within it.
+        next_page, prev_page: Scratch buffers with one slot per page, holding
+            the doubly linked list of non-empty pages (-1 ends it).
+        selected: Output buffer with one slot per draw.
+
+    Returns:
+        int: Number of drawn papers (written to `selected`).
+    """
+    # Link the non-empty pages in rank order
+    head = -1
+    last = -1
+    n_active = 0
+    for page in range(len(page_sizes)):
+        if page_sizes[page] > 0:
+            if last == -1:
+                head = page
+            else:
+                next_page[last] = page
+            prev_page[page] = last
+            last = page
+            n_active += 1
+    if last != -1:
+        next_page[last] = -1
+
+    n_selected = 0
+    for draw in range(len(page_uniforms)):
+        if n_active == 0:
+            break
+
+        # Inverse-CDF lookup over the active pages: a linear walk, since
+        # exp(-x) weights put the target on one of the first pages
+        target = page_uniforms[draw] * page_weights[n_active - 1]
+        rel_idx = 0
+        page = head
+        while rel_idx < n_active - 1 and page_weights[rel_idx] <= target:
+            rel_idx += 1
+            page = next_page[page]
+
+        # Order within a page is irrelevant: remove the drawn paper by
+        # moving the page's last one into its slot
+        page_start = page * page_size
+        size = page_sizes[page]
+        position = page_start + int(paper_uniforms[draw] * size)
+
+        selected[n_selected] = ranked[position]
+        n_selected += 1
+        ranked[position] = ranked[page_start + size - 1]
+        page_sizes[page] = size - 1
+
+        # Unlink an emptied page in O(1)
+        if size == 1:
+            before = prev_page[page]
+            after = next_page[page]
+            if before == -1:
+                head = after
+            else:
+                next_page[before] = after
+            if after != -1:
+                prev_page[after] = before
+            n_active -= 1
+
+    return n_selected
+
+
+_sample_positions_compiled = (
+    njit(cache=True)(_sample_positions) if njit is not None else None
+)
+
+
+# -------------------------------------------------------------------
+# ChromaDB connection
+# -------------------------------------------------------------------
+@functools.lru_cache(maxsize=None)
+def _open_collection(host, port, name="articles_with_score"):
+    """
+    Open a ChromaDB collection once per process.
+
+    Clients (and the collection's index) are shared by all aggregators of
+    the process connecting to the same database, so creating another
+    aggregator does not reattach to it.
+
+    Args:
+        host (str | None): ChromaDB server host; None opens data/chroma.
+        port (int): ChromaDB server port.
+        name (str): Collection name.
+    """
+    settings = chromadb.Settings(anonymized_telemetry=False)
+    if host is not None:
+        client = chromadb.HttpClient(host=host, port=port, settings=settings)
+    else:
+        client = chromadb.PersistentClient(path="data/chroma", settings=settings)
+    return client.get_or_create_collection(name=name)
+
+
+# -------------------------------------------------------------------
+# Query result cache
+# -------------------------------------------------------------------
+class QueryCache:
+    """
+    Thread-safe LRU cache of ChromaDB responses.
+
+    Entries are keyed on the raw float32 bytes of a query embedding and
+    the number of requested results, and optionally expire after `ttl`
+    seconds.
+    """
+
+    def __init__(self, max_size=QUERY_CACHE_SIZE, ttl=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = collections.OrderedDict()
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def key(query_embedding, max_similarities):
+        return (
+            np.asarray(query_embedding, dtype=np.float32).tobytes(),
+            max_similarities
+        )
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
 
 
 # -------------------------------------------------------------------
@@ -35,14 +221,34 @@ class VirtualAggregator:
     distribution.
     """
 
-    def __init__(self):
+    def __init__(self, connect=True, cache_size=QUERY_CACHE_SIZE, cache_ttl=None,
+                 chroma_host=None, chroma_port=8000):
         """
         Initialize the aggregator and load the pre-fitted global scaler.
+
+        Args:
+            connect (bool): Open the ChromaDB connection. Sampling-only
+                instances (e.g. worker processes) skip it.
+            cache_size (int): ChromaDB responses kept for repeated query
+                embeddings (0 disables the cache).
+            cache_ttl (float | None): Seconds after which a cached
+                response expires; None keeps it until evicted.
+            chroma_host (str | None): Host of a ChromaDB server (see
+                docker-compose.yaml); None opens the local data/chroma
+                database in-process.
+            chroma_port (int): Port of the ChromaDB server.
         """
         self.N = None
         self.k = None
         self.pn = None
+        self.chroma_host = chroma_host
+        self.chroma_port = chroma_port
         self.chroma_collection = None
+        self._query_cache = QueryCache(cache_size, cache_ttl)
+        # Page distributions and cumulative weights by number of pages
+        # (see distribution_function and page_weights)
+        self._distribution_cache = {}
+        self._weights_cache = {}
 
         # Load globally fitted scaler to ensure consistency across experiments
         try:
@@ -52,8 +258,35 @@ class VirtualAggregator:
                 "Global scaler not found at models/global_scaler.pkl. "
                 "Run the scaler preparation step first."
             )
+        # Candidates are only ever transformed, never refitted per query
+        if not hasattr(self.scaler, "n_features_in_"):
+            raise RuntimeError(
+                "models/global_scaler.pkl holds an unfitted scaler. "
+                "Run the scaler preparation step first."
+            )
 
-        self.init_connection()
+        # MinMaxScaler is a plain affine map; keep its coefficients so the
+        # hot path avoids sklearn's per-call validation overhead
+        if hasattr(self.scaler, "min_") and hasattr(self.scaler, "scale_"):
+            self._scale = np.asarray(self.scaler.scale_, dtype=np.float32)
+            self._offset = np.asarray(self.scaler.min_, dtype=np.float32)
+            self._clip = (
+                self.scaler.feature_range if getattr(self.scaler, "clip", False) else None
+            )
+        else:
+            self._scale = self._offset = self._clip = None
+
+        # Compile the sampling kernel up front (numba caches it on disk)
+        if _sample_positions_compiled is not None:
+            _sample_positions_compiled(
+                np.zeros(1, dtype=np.int64), np.ones(1, dtype=np.int64), 1,
+                self.page_weights(1), np.zeros(1), np.zeros(1),
+                np.empty(1, dtype=np.int64), np.empty(1, dtype=np.int64),
+                np.empty(1, dtype=np.int64)
+            )
+
+        if connect:
+            self.init_connection()
 
     def set_parameters(self, N, k, pn):
         """
@@ -68,24 +301,29 @@ class VirtualAggregator:
         self.N = N
         self.k = k
         self.pn = pn
+        # Weights as a vector matching the columns of the candidate
+        # feature matrix (see prepare_candidates)
+        self.pn_vector = np.asarray(pn, dtype=np.float32)
 
     # -------------------------------------------------------------------
     # Database connection
     # -------------------------------------------------------------------
     def init_connection(self):
         """
-        Initialize a persistent connection to the ChromaDB collection.
+        Initialize a connection to the ChromaDB collection.
 
-        The method retries the connection multiple times before failing.
+        Connects to the ChromaDB server at `chroma_host` when one is set,
+        otherwise opens the persistent local database; the collection is
+        shared within the process (see _open_collection). The method
+        retries the connection multiple times before failing.
         """
         max_retries = 5
         retries = 0
 
         while retries < max_retries:
             try:
-                chroma_client = chromadb.PersistentClient(path="data/chroma")
-                self.chroma_collection = chroma_client.get_or_create_collection(
-                    name="articles_with_score"
+                self.chroma_collection = _open_collection(
+                    self.chroma_host, self.chroma_port
                 )
                 return
             except Exception as e:
@@ -106,12 +344,55 @@ class VirtualAggregator:
             max_similarities (int): Number of results to retrieve.
 
         Returns:
-            dict: Raw ChromaDB query response.
+            dict: Raw ChromaDB query response (shared with the query cache,
+            so it must not be modified).
+        """
+        key = QueryCache.key(query_embedding, max_similarities)
+        results = self._query_cache.get(key)
+        if results is None:
+            results = self.chroma_collection.query(
+                query_embeddings=[query_embedding],
+                n_results=max_similarities
+            )
+            self._query_cache.put(key, results)
+        return results
+
+    def get_similar_articles_batch(self, query_embeddings, max_similarities):
+        """
+        Retrieve similar articles for several queries in one ChromaDB call.
+
+        Args:
+            query_embeddings (Sequence[list or np.ndarray]): Query embedding
+                vectors.
+            max_similarities (int): Number of results to retrieve per query.
+
+        Returns:
+            list[dict]: One response per query, shaped like the response of
+            `get_similar_articles`, so it can be passed to
+            `prepare_candidates`. Only the embeddings missing from the query
+            cache are searched.
         """
-        return self.chroma_collection.query(
-            query_embeddings=[query_embedding],
+        keys = [
+            QueryCache.key(embedding, max_similarities)
+            for embedding in query_embeddings
+        ]
+        responses = [self._query_cache.get(key) for key in keys]
+        misses = [i for i, response in enumerate(responses) if response is None]
+        if not misses:
+            return responses
+
+        results = self.chroma_collection.query(
+            query_embeddings=[query_embeddings[i] for i in misses],
             n_results=max_similarities
         )
+        fields = [
+            key for key in ("ids", "distances", "metadatas")
+            if results.get(key) is not None
+        ]
+        for position, i in enumerate(misses):
+            responses[i] = {key: [results[key][position]] for key in fields}
+            self._query_cache.put(keys[i], responses[i])
+        return responses
 
     # -------------------------------------------------------------------
     # Page probability distribution
@@ -121,17 +402,43 @@ class VirtualAggregator:
         Compute an exponential probability distribution over ranked pages.
 
         The probability of selecting page x is proportional to exp(-x).
+        Distributions are computed once per number of pages and cached.
 
         Args:
             number_of_pages (int): Number of ranked pages.
 
         Returns:
-            np.ndarray: Normalized probability distribution.
+            np.ndarray: Normalized probability distribution (read-only).
         """
-        distribution = np.exp(-np.arange(1, number_of_pages + 1))
-        distribution /= distribution.sum()
+        distribution = self._distribution_cache.get(number_of_pages)
+        if distribution is None:
+            distribution = np.exp(-np.arange(1, number_of_pages + 1))
+            distribution /= distribution.sum()
+            distribution.setflags(write=False)
+            self._distribution_cache[number_of_pages] = distribution
         return distribution
 
+    def page_weights(self, number_of_pages):
+        """
+        Cumulative, unnormalized weights of distribution_function().
+
+        Entry j is the sum of exp(-x) for x = 1..j+1, so the first m
+        entries form the CDF over m pages up to the factor 1 / entry m-1.
+        Cached per number of pages.
+
+        Args:
+            number_of_pages (int): Number of ranked pages.
+
+        Returns:
+            np.ndarray: Cumulative page weights (read-only).
+        """
+        weights = self._weights_cache.get(number_of_pages)
+        if weights is None:
+            weights = np.cumsum(np.exp(-np.arange(1, number_of_pages + 1)))
+            weights.setflags(write=False)
+            self._weights_cache[number_of_pages] = weights
+        return weights
+
     # -------------------------------------------------------------------
     # Candidate preparation
     # -------------------------------------------------------------------
@@ -146,100 +453,180 @@ class VirtualAggregator:
             results (dict): Raw ChromaDB query response.
 
         Returns:
-            dict: Preprocessed candidate features ready for scoring.
+            dict: Candidate ids (numpy string array), an (n, 4) float32
+            feature matrix with columns [similarity, year, citation count,
+            government score], so scoring is a single matrix-vector product,
+            and an empty ranking cache (see rank_and_sample).
         """
-        ids = [str(x) for x in results["ids"][0]]
+        # Extract metadata in a single pass into a (n, 3) feature matrix:
+        # [year, log citation count, government score]. Records loaded by
+        # FeatureBuilder.load_to_chroma store the log count; older ones only
+        # have the raw count, which is log-transformed here (per record, so
+        # a collection may mix both).
+        metadatas = results["metadatas"][0]
+        features = np.fromiter(
+            (
+                value for m in metadatas
+                for value in (m["year"], m.get("n_citation_log", np.nan), m["gov_score"])
+            ),
+            dtype=np.float32,
+            count=3 * len(metadatas)
+        ).reshape(-1, 3)
+
+        missing = np.flatnonzero(np.isnan(features[:, 1]))
+        if len(missing):
+            # In float64, like the stored values, so both give the same features
+            raw_counts = np.fromiter(
+                (metadatas[i]["n_citation"] for i in missing),
+                dtype=np.float64,
+                count=len(missing)
+            )
+            features[missing, 1] = np.log1p(raw_counts)
 
-        # Convert distances to similarity scores
-        distances = np.array(results["distances"][0])
-        similarities = np.maximum(0, 1 - distances)
+        return self._build_candidates(results["ids"][0], results["distances"][0], features)
+
+    def _build_candidates(self, ids, distances, features):
+        """
+        Assemble prepared candidates from typed columns.
 
-        # Extract metadata
-        years = [m["year"] for m in results["metadatas"][0]]
-        citations = [m["n_citation"] for m in results["metadatas"][0]]
-        gov_scores = [m["gov_score"] for m in results["metadatas"][0]]
+        Args:
+            ids (Sequence[str]): Candidate identifiers.
+            distances (Sequence[float]): Query distances of the candidates.
+            features (np.ndarray): (n, 3) float32 matrix [year, log citation
+                count, government score], normalized in place.
 
-        # Log-transform citation counts
-        citations_log = np.log1p(np.array(citations))
+        Returns:
+            dict: See prepare_candidates().
+        """
+        # Features are float32 throughout, matching the scoring precision
+        ids = np.asarray(ids, dtype=str)
+
+        # Convert distances to similarity scores
+        distances = np.asarray(distances, dtype=np.float32)
+        similarities = np.maximum(np.float32(0), np.float32(1) - distances)
 
         # Apply global normalization
-        features = np.column_stack([years, citations_log, gov_scores])
-        scaled_features = self.scaler.transform(features)
+        if self._scale is not None:
+            features *= self._scale
+            features += self._offset
+            if self._clip is not None:
+                np.clip(features, self._clip[0], self._clip[1], out=features)
+            scaled_features = features
+        else:
+            scaled_features = self.scaler.transform(features)
+
+        candidate_features = np.empty((len(ids), 4), dtype=np.float32)
+        candidate_features[:, 0] = similarities
+        candidate_features[:, 1:] = scaled_features
 
         return {
             "ids": ids,
-            "sim": similarities,
-            "scaled": scaled_features
+            "features": candidate_features,
+            "rankings": {}
         }
 
     # -------------------------------------------------------------------
     # Ranking and sampling
     # -------------------------------------------------------------------
-    def rank_and_sample(self, candidates):
+    def rank_and_sample(self, candidates, rng=None):
         """
         Rank candidate articles and sample papers probabilistically.
 
         Args:
             candidates (dict): Output of prepare_candidates().
+            rng (np.random.Generator, optional): Random generator used for
+                sampling (seeded from OS entropy by default).
 
         Returns:
             collections.Counter: Sampled paper identifiers with frequencies.
-        """
-        scores = (
-            self.pn[0] * candidates["sim"] +
-            self.pn[1] * candidates["scaled"][:, 0] +
-            self.pn[2] * candidates["scaled"][:, 1] +
-            self.pn[3] * candidates["scaled"][:, 2]
-        )
-
-        sorted_indices = np.argsort(-scores)
-        ranked_ids = [candidates["ids"][i] for i in sorted_indices]
-
-        pages = [
-            ranked_ids[i:i + self.N]
-            for i in range(0, len(ranked_ids), self.N)
-        ]
-
-        selected_papers = []
-        working_pages = [list(p) for p in pages]
 
-        for _ in range(self.k):
-            active_indices = [
-                idx for idx, p in enumerate(working_pages) if len(p) > 0
-            ]
-            if not active_indices:
-                break
-
-            page_distribution = self.distribution_function(len(active_indices))
-            rel_idx = np.random.choice(len(active_indices), p=page_distribution)
-            abs_page_idx = active_indices[rel_idx]
-
-            page = working_pages[abs_page_idx]
-            paper_id = random.choice(page)
-
-            selected_papers.append(paper_id)
-            working_pages[abs_page_idx].remove(paper_id)
+        Rankings are cached in `candidates["rankings"]` by weight vector, so
+        configurations of the same query that differ only in N and k sort
+        the candidates once.
+        """
+        if rng is None:
+            rng = np.random.default_rng()
+
+        # Pages are stored as one flat array of candidate positions in rank
+        # order: page p occupies [p * N, p * N + page_sizes[p]). Only
+        # integers move during sampling; ids are looked up at the end.
+        # Only the top candidates that can be drawn are selected (O(n)) and
+        # sorted: MAX_EFFECTIVE_PAGES pages plus the k papers the sample can
+        # take out of earlier pages, so the sample always fills
+        # min(k, n_candidates).
+        n_candidates = len(candidates["ids"])
+        top = self.N * MAX_EFFECTIVE_PAGES + self.k
+        rankings = candidates.setdefault("rankings", {})
+        ranking_key = (self.pn_vector.tobytes(), min(top, n_candidates))
+        ranked = rankings.get(ranking_key)
+        if ranked is None:
+            neg_scores = -(candidates["features"] @ self.pn_vector)
+            if n_candidates > top:
+                ranked = np.argpartition(neg_scores, top - 1)[:top]
+                ranked = ranked[np.argsort(neg_scores[ranked])]
+            else:
+                ranked = np.argsort(neg_scores)
+            rankings[ranking_key] = ranked
+        n_pages = -(-len(ranked) // self.N)
+        page_sizes = np.full(n_pages, self.N, dtype=np.int64)
+        if n_pages:
+            page_sizes[-1] = len(ranked) - (n_pages - 1) * self.N
+
+        # Per draw: one uniform selecting the page, one the paper in it
+        page_uniforms, paper_uniforms = rng.random((2, self.k))
+        page_weights = self.page_weights(n_pages)
+
+        if _sample_positions_compiled is not None:
+            selected = np.empty(self.k, dtype=np.int64)
+            # The kernel reorders pages in place; keep the cached ranking
+            # intact
+            n_selected = _sample_positions_compiled(
+                ranked.copy(), page_sizes, self.N, page_weights,
+                page_uniforms, paper_uniforms,
+                np.empty(n_pages, dtype=np.int64),
+                np.empty(n_pages, dtype=np.int64),
+                selected
+            )
+        else:
+            selected = [0] * self.k
+            n_selected = _sample_positions(
+                ranked.tolist(), page_sizes.tolist(), self.N, page_weights.tolist(),
+                page_uniforms.tolist(), paper_uniforms.tolist(),
+                [0] * n_pages, [0] * n_pages, selected
+            )
 
-        return collections.Counter(selected_papers)
+        # Draws are without replacement, so every selected paper is counted
+        # exactly once and the Counter is built from a mapping (no counting pass)
+        return collections.Counter(
+            dict.fromkeys(candidates["ids"][selected[:n_selected]].tolist(), 1)
+        )
 
     # -------------------------------------------------------------------
     # Legacy compatibility
     # -------------------------------------------------------------------
-    def distribution_generator(self, collection_dict):
+    def distribution_generator(self, collection_dict, rng=None):
         """
         Legacy wrapper for backward compatibility with older interfaces.
+
+        The columns are converted to typed arrays directly, without going
+        through per-article metadata dicts.
+
+        Args:
+            collection_dict (dict): Candidate columns (id, distance, year,
+                n_citation, gov_score).
+            rng (np.random.Generator | int, optional): Random generator, or a
+                seed for one. Sampling no longer reads the global np.random
+                state, so pass this for reproducible results; without it the
+                generator is seeded from OS entropy.
         """
-        mock_results = {
-            "ids": [collection_dict["id"]],
-            "distances": [collection_dict["distance"]],
-            "metadatas": [[
-                {"year": y, "n_citation": c, "gov_score": g}
-                for y, c, g in zip(
-                    collection_dict["year"],
-                    collection_dict["n_citation"],
-                    collection_dict["gov_score"]
-                )
-            ]]
-        }
-        prepared = self.prepare_candidates(mock_results)
-        return self.rank_and_sample(prepared)
+        features = np.empty((len(collection_dict["id"]), 3), dtype=np.float32)
+        features[:, 0] = collection_dict["year"]
+        features[:, 1] = np.log1p(
+            np.asarray(collection_dict["n_citation"], dtype=np.float64)
+        )
+        features[:, 2] = collection_dict["gov_score"]
+
+        prepared = self._build_candidates(
+            collection_dict["id"], collection_dict["distance"], features
+        )
+        return self.rank_and_sample(prepared, np.random.default_rng(rng))
@@ -9,11 +9,11 @@ and executes the experiment in batch mode with checkpoint recovery.
 
 Inputs:
     - data/external/settings.pkl
-    - data/interim/queries_with_embeddings.pkl
+    - data/interim/queries_with_embeddings.npy
 
 Outputs:
-    - data/results/{config_id}/results.csv
-    - data/processed/global_distributions.csv
+    - data/results/{config_id}/part-*.parquet
+    - data/processed/global_distributions.parquet
 """
 
 import os
@@ -68,7 +68,13 @@ def main():
     # -------------------------------------------------------------------
     # Experiment initialization
     # -------------------------------------------------------------------
-    experiment = Experiment(settings)
+    # Query a ChromaDB server (e.g. the docker-compose service) when
+    # CHROMA_HOST is set, otherwise the local data/chroma database
+    experiment = Experiment(
+        settings,
+        chroma_host=os.environ.get("CHROMA_HOST"),
+        chroma_port=int(os.environ.get("CHROMA_PORT", 8000))
+    )
 
     # -------------------------------------------------------------------
     # Batch execution
@@ -4,7 +4,10 @@ from sklearn.preprocessing import MinMaxScaler
 import numpy as np
 
 # Wczytaj główny zbiór danych (wszystkie artykuły)
-df = pd.read_csv('data/interim/articles_with_score_df.csv')
+df = pd.read_parquet(
+    'data/interim/articles_with_score_df.parquet',
+    columns=['year', 'n_citation', 'gov_score']
+)
 
 # Logarytmowanie cytowań przed skalowaniem
 # aby rozkład potęgowy nie "zbił" wszystkich wyników do zera.
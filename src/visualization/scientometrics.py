@@ -1,8 +1,8 @@
 # -*- coding: utf-8 -*-
 
 import os
-import json
 import re
+import orjson
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
@@ -30,7 +30,8 @@ class ScientometricsAnalyzer:
         """
         Parse dictionary-like strings into native Python dictionaries.
 
-        Handles common serialization issues:
+        Canonical JSON (written by current producers) is parsed directly.
+        Older files are normalized first to handle:
         - integer keys not quoted (non-JSON)
         - single vs double quotes
         - Python literal representations
@@ -38,10 +39,15 @@ class ScientometricsAnalyzer:
         if not isinstance(data_str, str):
             return data_str
 
+        try:
+            return orjson.loads(data_str)
+        except orjson.JSONDecodeError:
+            pass
+
         try:
             formatted = re.sub(r'(\s*)(\d+):', r'\1"\2":', data_str)
             formatted = formatted.replace("'", '"')
-            return json.loads(formatted)
+            return orjson.loads(formatted)
         except Exception:
             import ast
             return ast.literal_eval(data_str)
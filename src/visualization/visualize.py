@@ -14,6 +14,7 @@ import ast
 import collections
 import pandas as pd
 import numpy as np
+import pyarrow.parquet as pq
 import matplotlib.pyplot as plt
 import powerlaw
 
@@ -24,20 +25,54 @@ from matplotlib.backends.backend_pdf import PdfPages
 # -------------------------------------------------------------------
 # Data loading
 # -------------------------------------------------------------------
-def load_results(processed_path="data/processed/global_distributions.csv"):
+def load_results(processed_path="data/processed/global_distributions.parquet"):
     """
     Load aggregated experiment results.
 
     Parameters:
-        processed_path (str): Path to CSV with global distributions.
+        processed_path (str): Path to Parquet with global distributions
+            (a .csv path is read in the legacy serialized-dict format).
 
     Returns:
         pd.DataFrame: Parsed results with Python objects restored.
     """
-    df = pd.read_csv(processed_path)
-    df["settings"] = df["settings"].apply(ast.literal_eval)
-    df["distribution"] = df["distribution"].apply(ast.literal_eval)
-    return df
+    chunks = list(iter_results(processed_path))
+    if not chunks:
+        return pd.DataFrame(columns=["settings", "distribution"])
+    return pd.concat(chunks, ignore_index=True)
+
+
+def iter_results(processed_path="data/processed/global_distributions.parquet",
+                 chunksize=16):
+    """
+    Stream aggregated experiment results in chunks of configurations.
+
+    Only one chunk of distributions is expanded into Python dicts at a
+    time, which keeps report generation within O(chunksize) memory.
+
+    Parameters:
+        processed_path (str): Path to Parquet with global distributions
+            (a .csv path is read in the legacy serialized-dict format).
+        chunksize (int): Configurations per chunk.
+
+    Yields:
+        pd.DataFrame: Parsed results with Python objects restored.
+    """
+    if processed_path.endswith(".csv"):
+        for df in pd.read_csv(processed_path, chunksize=chunksize):
+            df["distribution"] = df["distribution"].apply(ast.literal_eval)
+            df["settings"] = df["settings"].apply(ast.literal_eval)
+            yield df
+        return
+
+    for batch in pq.ParquetFile(processed_path).iter_batches(batch_size=chunksize):
+        df = batch.to_pandas()
+        df["distribution"] = [
+            dict(zip(paper_ids.tolist(), counts.tolist()))
+            for paper_ids, counts in zip(df.pop("paper_ids"), df.pop("counts"))
+        ]
+        df["settings"] = df["settings"].apply(ast.literal_eval)
+        yield df
 
 
 # -------------------------------------------------------------------
@@ -65,18 +100,29 @@ def calculate_ks_metrics(dist_citations, reference_dist):
 
     Parameters:
         dist_citations (dict): Experimental citation distribution
-        reference_dist (dict): Empirical/reference distribution
+        reference_dist (dict | np.ndarray): Empirical/reference distribution,
+            or its values from reference_values() when comparing many
+            distributions against the same reference
 
     Returns:
         tuple: (KS statistic, p-value)
     """
-    exp_values = list(dist_citations.values())
-    ref_values = list(reference_dist.values())
+    exp_values = np.fromiter(dist_citations.values(), dtype=np.float64)
+    if not isinstance(reference_dist, np.ndarray):
+        reference_dist = reference_values(reference_dist)
 
-    ks_stat, p_val = ks_2samp(exp_values, ref_values)
+    ks_stat, p_val = ks_2samp(exp_values, reference_dist)
     return ks_stat, p_val
 
 
+def reference_values(reference_dist):
+    """
+    Convert a reference distribution into the sorted sample array used by
+    calculate_ks_metrics, so it is built once per report.
+    """
+    return np.sort(np.fromiter(reference_dist.values(), dtype=np.float64))
+
+
 # -------------------------------------------------------------------
 # Visualization
 # -------------------------------------------------------------------
@@ -99,6 +145,20 @@ def plot_zipf_comparison(
         p_val (float): KS p-value
         pdf_handle (PdfPages, optional): PDF output handler
     """
+    fig, ax = plt.subplots(figsize=(12, 8))
+    _draw_zipf_comparison(ax, exp_dist, ref_dist, settings_str, ks_stat, p_val)
+
+    if pdf_handle is not None:
+        pdf_handle.savefig(fig)
+        plt.close(fig)
+    else:
+        plt.show()
+
+
+def _draw_zipf_comparison(ax, exp_dist, ref_dist, settings_str, ks_stat, p_val):
+    """
+    Draw the Zipf comparison plot on an existing (cleared) Axes.
+    """
     exp_data = (
         pd.DataFrame(exp_dist.items(), columns=["Citations", "Count"])
         .sort_values("Citations")
@@ -108,15 +168,14 @@ def plot_zipf_comparison(
         .sort_values("Citations")
     )
 
-    plt.figure(figsize=(12, 8))
-    plt.loglog(
+    ax.loglog(
         exp_data["Citations"],
         exp_data["Count"],
         "o-",
         label="Simulation",
         markersize=3
     )
-    plt.loglog(
+    ax.loglog(
         ref_data["Citations"],
         ref_data["Count"],
         "s-",
@@ -124,27 +183,21 @@ def plot_zipf_comparison(
         markersize=3
     )
 
-    plt.title(f"Zipf Plot — {settings_str}")
-    plt.xlabel("Number of citations")
-    plt.ylabel("Frequency")
-    plt.grid(True, which="both", linestyle="--", alpha=0.5)
+    ax.set_title(f"Zipf Plot — {settings_str}")
+    ax.set_xlabel("Number of citations")
+    ax.set_ylabel("Frequency")
+    ax.grid(True, which="both", linestyle="--", alpha=0.5)
 
     stats_text = f"KS statistic: {ks_stat:.4f}\nP-value: {p_val:.4f}"
-    plt.text(
+    ax.text(
         0.05,
         0.05,
         stats_text,
-        transform=plt.gca().transAxes,
+        transform=ax.transAxes,
         bbox=dict(facecolor="white", alpha=0.85)
     )
 
-    plt.legend()
-
-    if pdf_handle is not None:
-        pdf_handle.savefig()
-        plt.close()
-    else:
-        plt.show()
+    ax.legend()
 
 
 # -------------------------------------------------------------------
@@ -159,23 +212,37 @@ def generate_report_pdf(
     Generate a PDF report containing Zipf plots for all configurations.
 
     Parameters:
-        df (pd.DataFrame): Experiment results
+        df (pd.DataFrame | Iterable[pd.DataFrame]): Experiment results, or
+            chunks of them from iter_results()
         reference_dist (dict): Empirical citation distribution
         output_path (str): Output PDF path
+
+    A single Figure is reused for all pages; its Axes are cleared and
+    redrawn for every configuration.
     """
-    with PdfPages(output_path) as pdf:
-        for _, row in df.iterrows():
-            citation_dist = get_citation_distribution(row["distribution"])
-            ks_stat, p_val = calculate_ks_metrics(
-                citation_dist,
-                reference_dist
-            )
-
-            plot_zipf_comparison(
-                citation_dist,
-                reference_dist,
-                settings_str=str(row["settings"]),
-                ks_stat=ks_stat,
-                p_val=p_val,
-                pdf_handle=pdf
-            )
\ No newline at end of file
+    ref_values = reference_values(reference_dist)
+    chunks = [df] if isinstance(df, pd.DataFrame) else df
+
+    fig, ax = plt.subplots(figsize=(12, 8))
+    try:
+        with PdfPages(output_path) as pdf:
+            for chunk in chunks:
+                for _, row in chunk.iterrows():
+                    citation_dist = get_citation_distribution(row["distribution"])
+                    ks_stat, p_val = calculate_ks_metrics(
+                        citation_dist,
+                        ref_values
+                    )
+
+                    ax.cla()
+                    _draw_zipf_comparison(
+                        ax,
+                        citation_dist,
+                        reference_dist,
+                        settings_str=str(row["settings"]),
+                        ks_stat=ks_stat,
+                        p_val=p_val
+                    )
+                    pdf.savefig(fig)
+    finally:
+        plt.close(fig)
\ No newline at end of file
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+"""
+Tests for the experiment orchestrator (src/models/experiment.py).
+
+Run from the repository root with: python -m unittest discover tests
+"""
+
+import os
+import zlib
+import tempfile
+import unittest
+from unittest import mock
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import MinMaxScaler
+
+try:
+    from src.models.experiment import Experiment
+except ImportError as e:  # e.g. chromadb not installed
+    raise unittest.SkipTest(f"experiment unavailable: {e}")
+
+SETTINGS = [
+    {"N": 10, "k": 10, "pn": [0.0, 0.0, 0.0, 1.0]},
+    {"N": 10, "k": 50, "pn": [0.25, 0.25, 0.25, 0.25]},
+    {"N": 20, "k": 30, "pn": [0.5, 0.0, 0.5, 0.0]},
+    {"N": 100, "k": 50, "pn": [1.0, 0.0, 0.0, 0.0]},
+]
+
+
+class FakeCollection:
+    """
+    Stands in for the ChromaDB collection: the neighbours of a query are
+    drawn from a generator seeded by its embedding.
+    """
+
+    def query(self, query_embeddings, n_results):
+        results = {"ids": [], "distances": [], "metadatas": []}
+        for embedding in query_embeddings:
+            seed = zlib.crc32(np.asarray(embedding, dtype=np.float32))
+            rng = np.random.default_rng(seed)
+            ids = rng.choice(5000, n_results, replace=False)
+            results["ids"].append([str(i) for i in ids])
+            distances = np.sort(rng.random(n_results))
+            results["distances"].append(distances.tolist())
+            results["metadatas"].append([
+                {
+                    "year": int(rng.integers(1990, 2020)),
+                    "n_citation": int(rng.integers(0, 500)),
+                    "gov_score": int(rng.choice([20, 40, 70, 100])),
+                }
+                for _ in ids
+            ])
+        return results
+
+
+class ResumeTest(unittest.TestCase):
+
+    def run_in(self, directory, batches, queries):
+        """
+        Run the experiment in `directory`, one run per batch size.
+        """
+        os.chdir(directory)
+        os.makedirs("models")
+        os.makedirs("data/interim")
+        rng = np.random.default_rng(0)
+        X = np.column_stack([
+            rng.integers(1990, 2020, 100),
+            np.log1p(rng.integers(0, 500, 100)),
+            rng.choice([20, 40, 70, 100], 100)
+        ])
+        joblib.dump(MinMaxScaler().fit(X), "models/global_scaler.pkl")
+        np.save("data/interim/queries_with_embeddings.npy", queries)
+
+        for batch in batches:
+            experiment = Experiment(SETTINGS, n_workers=1)
+            experiment.run_experiment(batch=batch)
+
+        results = {
+            settings_id: pd.read_parquet(f"data/results/{settings_id}")
+            .sort_values("query_id", ignore_index=True)
+            for settings_id in range(len(SETTINGS))
+        }
+        distributions = pd.read_parquet(
+            "data/processed/global_distributions.parquet"
+        )
+        return results, distributions
+
+    def test_resumed_run_matches_single_run(self):
+        queries = np.random.default_rng(1).standard_normal(
+            (12, 8)
+        ).astype(np.float32)
+
+        cwd = os.getcwd()
+        patch = mock.patch(
+            "src.models.simulation_engine._open_collection",
+            return_value=FakeCollection()
+        )
+        with patch, tempfile.TemporaryDirectory() as single, \
+                tempfile.TemporaryDirectory() as resumed:
+            try:
+                expected = self.run_in(single, [12], queries)
+                actual = self.run_in(resumed, [5, 7], queries)
+            finally:
+                os.chdir(cwd)
+
+        expected_results, expected_distributions = expected
+        actual_results, actual_distributions = actual
+        for settings_id in range(len(SETTINGS)):
+            with self.subTest(settings_id=settings_id):
+                self.assertEqual(len(actual_results[settings_id]), 12)
+                pd.testing.assert_frame_equal(
+                    actual_results[settings_id],
+                    expected_results[settings_id]
+                )
+        pd.testing.assert_frame_equal(
+            actual_distributions, expected_distributions
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+"""
+Tests for the simulation engine (src/models/simulation_engine.py).
+
+Run from the repository root with: python -m unittest discover tests
+"""
+
+import os
+import tempfile
+import unittest
+
+import joblib
+import numpy as np
+from sklearn.preprocessing import MinMaxScaler
+
+try:
+    from src.models.simulation_engine import MAX_EFFECTIVE_PAGES, VirtualAggregator
+except ImportError as e:  # e.g. chromadb not installed
+    raise unittest.SkipTest(f"simulation engine unavailable: {e}")
+
+
+class AggregatorTestCase(unittest.TestCase):
+    """
+    Runs against a sampling-only aggregator with a freshly fitted scaler.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        # VirtualAggregator loads models/global_scaler.pkl from the cwd
+        cls._cwd = os.getcwd()
+        cls._tmp = tempfile.TemporaryDirectory()
+        os.chdir(cls._tmp.name)
+        os.makedirs("models")
+        rng = np.random.default_rng(0)
+        X = np.column_stack([
+            rng.integers(1990, 2020, 100),
+            np.log1p(rng.integers(0, 500, 100)),
+            rng.choice([20, 40, 70, 100], 100)
+        ])
+        joblib.dump(MinMaxScaler().fit(X), "models/global_scaler.pkl")
+        cls.aggregator = VirtualAggregator(connect=False)
+
+    @classmethod
+    def tearDownClass(cls):
+        os.chdir(cls._cwd)
+        cls._tmp.cleanup()
+
+
+class RankAndSampleTest(AggregatorTestCase):
+
+    def candidates(self, n):
+        rng = np.random.default_rng(n)
+        return {
+            "ids": np.array([str(i) for i in range(n)]),
+            "features": rng.random((n, 4), dtype=np.float32),
+        }
+
+    def test_sample_fills_k_beyond_effective_pages(self):
+        # k > N * MAX_EFFECTIVE_PAGES, with more and fewer candidates than k
+        cases = [(1, 250, 250), (3, 200, 250), (7, 300, 250), (1, 40, 250)]
+        for N, k, n_candidates in cases:
+            with self.subTest(N=N, k=k, n_candidates=n_candidates):
+                self.assertGreater(k, N * MAX_EFFECTIVE_PAGES)
+                self.aggregator.set_parameters(N, k, [0.25, 0.25, 0.25, 0.25])
+                sample = self.aggregator.rank_and_sample(
+                    self.candidates(n_candidates), np.random.default_rng(1)
+                )
+                self.assertEqual(len(sample), min(k, n_candidates))
+                self.assertEqual(sum(sample.values()), min(k, n_candidates))
+
+
+class PrepareCandidatesTest(AggregatorTestCase):
+
+    def test_mixed_log_citation_metadata(self):
+        rng = np.random.default_rng(0)
+        metadatas = [
+            {"year": int(y), "n_citation": int(c), "gov_score": 40}
+            for y, c in zip(rng.integers(1990, 2020, 20), rng.integers(0, 500, 20))
+        ]
+        results = {
+            "ids": [[str(i) for i in range(20)]],
+            "distances": [rng.random(20).tolist()],
+            "metadatas": [metadatas],
+        }
+        expected = self.aggregator.prepare_candidates(results)["features"]
+
+        # Newer records carry the precomputed log count, older ones do not
+        for m in metadatas[1::2]:
+            m["n_citation_log"] = float(np.log1p(m["n_citation"]))
+        mixed = self.aggregator.prepare_candidates(results)["features"]
+
+        np.testing.assert_array_equal(mixed, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()